@@ -1,65 +1,82 @@
+import asyncio
 from typing import Optional, List
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
 from sqlalchemy.orm import Session
-from region_codes import get_region_name
-from database import get_db
+from region_codes import region_codes_of
+from database import get_db, get_write_db, run_db
 from models import PerformanceFacilityDB
-from schemas import PerformanceFacility
+from schemas import NearbyPerformanceFacility, PerformanceFacility
 from utils import fetch_facilities_from_kopis, update_facilities_database
+from fts import facilities_fts, search
+from geo import nearby
+from count_cache import count_cache
+from pagination import keyset_page, set_page_headers
 
 router = APIRouter()
 
+def filter_facilities(query, signgucode=None, signgucodesub=None, fcltychartr=None, shprfnmfct=None, ranked=True):
+    sido_code, gugun_code = region_codes_of(signgucode, signgucodesub)
+    if sido_code is not None:
+        query = query.filter(PerformanceFacilityDB.sido_code == sido_code)
+    if gugun_code is not None:
+        query = query.filter(PerformanceFacilityDB.gugun_code == gugun_code)
+
+    if fcltychartr:
+        query = query.filter(PerformanceFacilityDB.fcltychartr == fcltychartr)
+    query = search(query, PerformanceFacilityDB, facilities_fts, [("fcltynm", shprfnmfct)], ranked=ranked)
+
+    return query
+
 @router.post("/update-facilities")
 async def update_facilities(
     signgucode: Optional[str] = Query(None, description="지역(시도)코드"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """
         ## 사용금지!!
         ## 공연시설 DB 업데이트
     """
     try:
-        facilities = fetch_facilities_from_kopis(signgucode)
-        update_facilities_database(db, facilities)
-        return {"message": f"데이터 업데이트가 완료되었습니다. 업데이트된 시설 수: {len(facilities)}"}
+        # KOPIS 요청이 대부분인 긴 작업이므로 DB 스레드 풀이 아닌 별도 스레드에서 실행
+        result = await asyncio.to_thread(update_facilities_database, db, fetch_facilities_from_kopis(signgucode))
+        return {"message": f"데이터 업데이트가 완료되었습니다. 업데이트된 시설 수: {result.processed - len(result.failed)}"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"데이터 업데이트 중 오류 발생: {str(e)}")
 
+def list_facilities(db: Session, filters: dict, cpage: int, rows: int, cursor: Optional[str], include_total: bool):
+    query = filter_facilities(db.query(PerformanceFacilityDB), ranked=cursor is None, **filters)
+
+    total_count = count_cache.count(db, "performance_facilities", filters, query) if include_total else None
+    if cursor is not None:
+        facilities, next_cursor = keyset_page(query, [PerformanceFacilityDB.id], rows, cursor)
+    else:
+        facilities = query.offset((cpage - 1) * rows).limit(rows).all()
+        next_cursor = None
+    return facilities, next_cursor, total_count
+
 # 데이터 조회를 위한 엔드포인트
 @router.get("/performance-facilities", response_model=List[PerformanceFacility])
 async def get_performance_facilities(
+    response: Response,
     signgucode: Optional[str] = Query(None, description="지역(시도)코드"),
     signgucodesub: Optional[str] = Query(None, description="지역(구군)코드"),
     fcltychartr: Optional[str] = Query(None, description="공연시설특성코드"),
     shprfnmfct: Optional[str] = Query(None, description="공연시설명"),
     cpage: int = Query(1, description="현재페이지"),
     rows: int = Query(5, description="페이지당 목록 수"),
+    cursor: Optional[str] = Query(None, description="커서 페이지네이션 (첫 페이지는 빈 값, 이후 이전 응답의 X-Next-Cursor 헤더 값. 지정하면 cpage 무시)"),
+    include_total: bool = Query(True, description="전체 개수를 X-Total-Count 헤더로 반환"),
     db: Session = Depends(get_db)
 ):
     """
         공연시설 조회 API
+
+        cpage 대신 cursor를 사용하면 등록 순으로 정렬되고, 다음 페이지가 있으면 X-Next-Cursor 헤더에 커서를 반환합니다.
     """
-    query = db.query(PerformanceFacilityDB)
-    
-    region_name = get_region_name(signgucode, signgucodesub)
-    if region_name:
-        if signgucodesub:
-            sido_name = region_name.split()[0]
-            gugun_name = ' '.join(region_name.split()[1:])
-            print(gugun_name)
-            query = query.filter(PerformanceFacilityDB.sidonm == sido_name)
-            query = query.filter(PerformanceFacilityDB.gugunnm == gugun_name)
-        else:
-            query = query.filter(PerformanceFacilityDB.sidonm == region_name)
-    
-    if fcltychartr:
-        query = query.filter(PerformanceFacilityDB.fcltychartr == fcltychartr)
-    if shprfnmfct:
-        query = query.filter(PerformanceFacilityDB.fcltynm.like(f"%{shprfnmfct}%"))
-    
-    total_count = query.count()
-    facilities = query.offset((cpage - 1) * rows).limit(rows).all()
-    
+    filters = dict(signgucode=signgucode, signgucodesub=signgucodesub, fcltychartr=fcltychartr, shprfnmfct=shprfnmfct)
+    facilities, next_cursor, total_count = await run_db(list_facilities, db, filters, cpage, rows, cursor, include_total)
+    set_page_headers(response, next_cursor, total_count)
+
     if not facilities:
         raise HTTPException(status_code=404, detail="시설 정보를 찾을 수 없습니다.")
     
@@ -76,4 +93,42 @@ async def get_performance_facilities(
         adres=facility.adres,
         la=facility.la,
         lo=facility.lo
-    ) for facility in facilities]
\ No newline at end of file
+    ) for facility in facilities]
+
+def list_nearby_facilities(db: Session, lat: float, lon: float, radius: float, rows: int, fcltychartr: Optional[str]):
+    query = db.query(PerformanceFacilityDB)
+    if fcltychartr:
+        query = query.filter(PerformanceFacilityDB.fcltychartr == fcltychartr)
+    return nearby(query, PerformanceFacilityDB, lat, lon, radius, rows)
+
+@router.get("/performance-facilities/nearby", response_model=List[NearbyPerformanceFacility])
+async def get_nearby_facilities(
+    lat: float = Query(..., ge=-90, le=90, description="위도"),
+    lon: float = Query(..., ge=-180, le=180, description="경도"),
+    radius: float = Query(3, gt=0, le=100, description="반경(km)"),
+    rows: int = Query(20, ge=1, le=100, description="최대 목록 수"),
+    fcltychartr: Optional[str] = Query(None, description="공연시설특성코드"),
+    db: Session = Depends(get_db)
+):
+    """
+        주변 공연시설 조회 API
+
+        반경 안의 공연시설을 가까운 순으로 반환합니다. distance는 km 단위 거리입니다.
+    """
+    facilities = await run_db(list_nearby_facilities, db, lat, lon, radius, rows, fcltychartr)
+
+    return [NearbyPerformanceFacility(
+        fcltynm=facility.fcltynm,
+        mt10id=facility.mt10id,
+        mt13cnt=facility.mt13cnt,
+        fcltychartr=facility.fcltychartr,
+        sidonm=facility.sidonm,
+        gugunnm=facility.gugunnm,
+        opende=facility.opende or None,
+        seatscale=facility.seatscale,
+        relateurl=facility.relateurl or None,
+        adres=facility.adres,
+        la=facility.la,
+        lo=facility.lo,
+        distance=round(distance, 3)
+    ) for facility, distance in facilities]
@@ -1,33 +1,95 @@
+import asyncio
 from datetime import datetime
 from typing import Optional, List
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
 from sqlalchemy.orm import Session
-from database import get_db
-from models import PerformanceDB, PerformanceDetailDB, UpcomingPerformanceDB
+from database import get_db, run_db
+from models import PerformanceDB, PerformanceDetailDB
 from schemas import Performance, PerformanceDetail, PerformanceName
 from urllib.parse import unquote
+from utils import get_live_upcoming_model
+from fts import performances_fts, search
+from autocomplete import autocomplete_index
+from count_cache import count_cache
+from pagination import decode_cursor, encode_cursor, keyset_page, set_page_headers
+from region_codes import region_codes_of
+from genre_codes import resolve_genre
 
 router = APIRouter()
 
+def filter_performances(query, start_date, end_date, shprfnm=None, shprfnmfct=None, shcate=None, prfplccd=None,
+                        signgucode=None, signgucodesub=None, kidstate=None, prfstate=None, openrun=None, ranked=True):
+    """
+    /performances 필터. (query_plans.py의 인덱스 확인에도 사용)
+    ranked가 True이고 공연명/공연시설명 검색이 있으면 FTS 관련도 순으로 정렬됩니다.
+    """
+    query = query.filter(
+        PerformanceDB.prfpdfrom <= end_date,
+        PerformanceDB.prfpdto >= start_date
+    )
+
+    query = search(query, PerformanceDB, performances_fts, [
+        ("prfnm", shprfnm),
+        ("fcltynm", shprfnmfct),
+    ], ranked=ranked)
+    if shcate:
+        genre_code = resolve_genre(shcate)
+        if genre_code:
+            query = query.filter(PerformanceDB.genre_code == genre_code)
+        else:
+            # 장르 코드로 바꿀 수 없는 이름은 기존처럼 장르명으로 비교
+            query = query.filter(PerformanceDB.genrenm == shcate)
+    if prfplccd:
+        query = query.filter(PerformanceDB.mt20id.like(f"{prfplccd}%"))
+    # 공연 목록(area)에는 시도까지만 있으므로 구군 코드는 해당 시도로 조회
+    sido_code, _ = region_codes_of(signgucode, signgucodesub)
+    if sido_code is not None:
+        query = query.filter(PerformanceDB.sido_code == sido_code)
+    if kidstate:
+        query = query.filter(PerformanceDB.kidstate == kidstate)
+    if prfstate:
+        query = query.filter(PerformanceDB.prfstate == prfstate)
+    if openrun:
+        query = query.filter(PerformanceDB.openrun == openrun)
+
+    return query
+
+def list_performances(db: Session, start_date, end_date, filters: dict, cpage: int, rows: int, cursor: Optional[str], include_total: bool):
+    query = filter_performances(db.query(PerformanceDB), start_date, end_date, ranked=cursor is None, **filters)
+
+    total_count = count_cache.count(db, "performances", dict(filters, start_date=start_date, end_date=end_date), query) if include_total else None
+    if cursor is not None:
+        performances, next_cursor = keyset_page(query, [PerformanceDB.prfpdfrom, PerformanceDB.id], rows, cursor)
+    else:
+        performances = query.offset((cpage - 1) * rows).limit(rows).all()
+        next_cursor = None
+    return performances, next_cursor, total_count
+
 @router.get("/performances", response_model=List[Performance])
 async def get_performances(
+    response: Response,
     stdate: str = Query(..., description="공연시작일자"),
     eddate: str = Query(..., description="공연종료일자"),
     cpage: int = Query(1, description="현재페이지"),
     rows: int = Query(10, description="페이지당 목록 수"),
     shprfnm: Optional[str] = Query(None, description="공연명"),
     shprfnmfct: Optional[str] = Query(None, description="공연시설명"),
-    shcate: Optional[str] = Query(None, description="장르코드"),
+    shcate: Optional[str] = Query(None, description="장르코드 (장르명도 가능)"),
     prfplccd: Optional[str] = Query(None, description="공연장코드"),
     signgucode: Optional[str] = Query(None, description="지역(시도)코드"),
-    signgucodesub: Optional[str] = Query(None, description="지역(구군)코드"),
+    signgucodesub: Optional[str] = Query(None, description="지역(구군)코드 (해당 시도로 조회)"),
     kidstate: Optional[str] = Query(None, description="아동공연여부"),
     prfstate: Optional[str] = Query(None, description="공연상태코드"),
     openrun: Optional[str] = Query(None, description="오픈런"),
+    cursor: Optional[str] = Query(None, description="커서 페이지네이션 (첫 페이지는 빈 값, 이후 이전 응답의 X-Next-Cursor 헤더 값. 지정하면 cpage 무시)"),
+    include_total: bool = Query(True, description="전체 개수를 X-Total-Count 헤더로 반환"),
     db: Session = Depends(get_db)
 ):
     """
         ## 공연목록 조회 API
+
+        cpage 대신 cursor를 사용하면 공연시작일 순으로 정렬되고, 깊은 페이지도 일정한 속도로 조회됩니다.
+        다음 페이지가 있으면 X-Next-Cursor 헤더에 커서를 반환합니다.
     """
     try:
         start_date = datetime.strptime(stdate, "%Y%m%d").date()
@@ -35,32 +97,18 @@ async def get_performances(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYYMMDD.")
 
-    query = db.query(PerformanceDB).filter(
-        PerformanceDB.prfpdfrom <= end_date,
-        PerformanceDB.prfpdto >= start_date
+    # 쿼리와 전체 개수 캐시 키가 같은 값을 쓰도록 여기서 디코딩
+    filters = dict(
+        shprfnm=unquote(shprfnm) if shprfnm else shprfnm,
+        shprfnmfct=unquote(shprfnmfct) if shprfnmfct else shprfnmfct,
+        shcate=shcate, prfplccd=prfplccd,
+        signgucode=signgucode, signgucodesub=signgucodesub, kidstate=kidstate,
+        prfstate=prfstate, openrun=openrun
     )
-
-    if shprfnm:
-        query = query.filter(PerformanceDB.prfnm.like(f"%{unquote(shprfnm)}%"))
-    if shprfnmfct:
-        query = query.filter(PerformanceDB.fcltynm.like(f"%{unquote(shprfnmfct)}%"))
-    if shcate:
-        query = query.filter(PerformanceDB.genrenm == shcate)
-    if prfplccd:
-        query = query.filter(PerformanceDB.mt20id.like(f"{prfplccd}%"))
-    if signgucode:
-        query = query.filter(PerformanceDB.area.like(f"{signgucode}%"))
-    if signgucodesub:
-        query = query.filter(PerformanceDB.area.like(f"{signgucode}{signgucodesub}%"))
-    if kidstate:
-        query = query.filter(PerformanceDB.kidstate == kidstate)
-    if prfstate:
-        query = query.filter(PerformanceDB.prfstate == prfstate)
-    if openrun:
-        query = query.filter(PerformanceDB.openrun == openrun)
-
-    total_count = query.count()
-    performances = query.offset((cpage - 1) * rows).limit(rows).all()
+    performances, next_cursor, total_count = await run_db(
+        list_performances, db, start_date, end_date, filters, cpage, rows, cursor, include_total
+    )
+    set_page_headers(response, next_cursor, total_count)
 
     return [Performance(
         mt20id=perf.mt20id,
@@ -75,13 +123,15 @@ async def get_performances(
         area=perf.area
     ) for perf in performances]
 
+def list_upcoming_performances(db: Session, today):
+    upcoming = get_live_upcoming_model(db)
+    return db.query(upcoming).filter(
+        upcoming.prfpdfrom > today
+    ).order_by(upcoming.prfpdfrom).all()
+
 @router.get("/upcoming-performances", response_model=List[Performance])
 async def get_upcoming_performances(db: Session = Depends(get_db)):
-    today = datetime.now().date()
-
-    performances = db.query(UpcomingPerformanceDB).filter(
-        UpcomingPerformanceDB.prfpdfrom > today
-    ).order_by(UpcomingPerformanceDB.prfpdfrom).all()
+    performances = await run_db(list_upcoming_performances, db, datetime.now().date())
 
     result = [
         {
@@ -108,7 +158,7 @@ async def get_performance_detail(mt20id: str, db: Session = Depends(get_db)):
     """
         ## 공연상세정보 조회 API
     """
-    db_detail = db.query(PerformanceDetailDB).filter(PerformanceDetailDB.mt20id == mt20id).first()
+    db_detail = await run_db(db.query(PerformanceDetailDB).filter(PerformanceDetailDB.mt20id == mt20id).first)
     if db_detail is None:
         raise HTTPException(status_code=404, detail="Performance not found")
     
@@ -136,15 +186,19 @@ async def get_performance_detail(mt20id: str, db: Session = Depends(get_db)):
 
 @router.get("/auto-fill", response_model=List[PerformanceName])
 async def get_auto_fill(
+    response: Response,
     stdate: str = Query(..., description="공연시작일자"),
     eddate: str = Query(..., description="공연종료일자"),
     cpage: int = Query(1, description="현재페이지"),
     rows: int = Query(10, description="페이지당 목록 수"),
     shprfnm: str = Query(... , description="공연명"),
+    cursor: Optional[str] = Query(None, description="커서 페이지네이션 (첫 페이지는 빈 값, 이후 이전 응답의 X-Next-Cursor 헤더 값. 지정하면 cpage 무시)"),
     db: Session = Depends(get_db)
 ):
     """
         ## 자동완성 API
+
+        공연명 접두어 일치를 먼저, 그 다음 부분 일치를 반환합니다. 초성 검색을 지원합니다. (ㅎㄹ, ㅎㅁㄹ -> 햄릿)
     """
 
     try:
@@ -153,15 +207,19 @@ async def get_auto_fill(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYYMMDD.")
 
-    query = db.query(PerformanceDB).filter(
-        PerformanceDB.prfpdfrom <= end_date,
-        PerformanceDB.prfpdto >= start_date
-    )
-
-    if shprfnm:
-        query = query.filter(PerformanceDB.prfnm.like(f"%{unquote(shprfnm)}%"))
-
-    total_count = query.count()
-    performance_names = query.offset((cpage - 1) * rows).limit(rows).all()
-
-    return [PerformanceName(prfnm=name.prfnm) for name in performance_names]
\ No newline at end of file
+    # 입력할 때마다 호출되므로 DB 대신 메모리 인덱스에서 찾음 (초성 검색 지원: ㅎㅁㄹ -> 햄릿)
+    # 갱신은 백그라운드에서 하고 그동안 기존 인덱스로 응답 (처음 만드는 중일 때만 이벤트 루프에서 기다림)
+    pending = await run_db(autocomplete_index.ensure_fresh, db)
+    if pending is not None and not autocomplete_index.ready:
+        await asyncio.wrap_future(pending)
+    # 메모리 인덱스라 건너뛰는 비용이 작으므로 커서에는 위치만 담음
+    offset = (cpage - 1) * rows
+    if cursor:
+        offset, = decode_cursor(cursor, 1)
+        if not isinstance(offset, int) or offset < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    entries = autocomplete_index.search(unquote(shprfnm), start_date, end_date, limit=rows + 1, offset=offset)
+    set_page_headers(response, encode_cursor([offset + rows]) if len(entries) > rows else None)
+    entries = entries[:rows]
+
+    return [PerformanceName(prfnm=entry.prfnm) for entry in entries]
\ No newline at end of file
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from database import get_db, run_db
+from scheduler import job_status
+from rate_limit import kopis_bucket
+
+router = APIRouter()
+
+@router.get("/sync/status")
+async def get_sync_status(db: Session = Depends(get_db)):
+    """
+        ## 동기화 작업 상태 조회
+        작업별 마지막 실행 시각, 소요 시간, 처리 건수를 반환합니다.
+    """
+    return await run_db(job_status, db)
+
+
+@router.get("/sync/rate-limit")
+async def get_rate_limit_stats():
+    """
+        ## KOPIS 요청 속도 제한 현황
+        이 워커 프로세스의 요청 수, 대기한 시간, 거부된 요청 수를 반환합니다.
+    """
+    return kopis_bucket.stats()
@@ -1,77 +1,71 @@
-import itertools
-import random
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
-from config import KOPIS_API_KEY
 from schemas import Performance, UserPicksInput, RecommendedShows
-from utils import create_token, verify_token
-from database import get_db
+from sqlalchemy import delete, select
+from utils import create_token, user_key_of, verify_token
+from bulk import bulk_upsert, existing_keys
+from database import get_db, get_write_db, run_db
 from models import UserPick, PerformanceDB
-from typing import List
-import aiohttp
-import xml.etree.ElementTree as ET
-from datetime import datetime
-import models, schemas
-from sqlalchemy import func
+from genre_codes import GENRE_CODE_MAP, resolve_genre
+from genre_partitions import genre_partitions
+from config import RECOMMENDED_SHOWS_PER_GENRE
+from typing import Dict, List, Optional
 
 router = APIRouter()
 security = HTTPBearer()
 
-GENRE_CODE_MAP = {
-    "AAAA": "연극",
-    "BBBC": "무용(서양/한국무용)",
-    "BBBE": "대중무용",
-    "CCCA": "서양음악(클래식)",
-    "CCCC": "한국음악(국악)",
-    "CCCD": "대중음악",
-    "EEEA": "복합",
-    "EEEB": "서커스/마술",
-    "GGGA": "뮤지컬"
-}
-
-async def fetch_kopis_data(base_url: str, params: dict) -> List[Performance]:
-    async with aiohttp.ClientSession() as session:
-        async with session.get(base_url, params=params) as response:
-            if response.status == 200:
-                xml_string = await response.text()
-                return parse_kopis_xml(xml_string)
-            else:
-                raise HTTPException(status_code=response.status, detail="KOPIS API request failed")
+async def fresh_genre_partitions(db: Session):
+    # 다시 만드는 것은 백그라운드에서 하고 그동안 기존 목록으로 응답 (처음 만드는 중일 때만 이벤트 루프에서 기다림)
+    pending = await run_db(genre_partitions.ensure_fresh, db)
+    if pending is not None and not genre_partitions.ready:
+        await asyncio.wrap_future(pending)
+
+def list_popular_by_genre(db: Session) -> List[PerformanceDB]:
+    # 장르별로 오늘 진행 중인 공연 중 가장 최근에 시작한 공연
+    picked = {}
+    for genre_code in GENRE_CODE_MAP:
+        running = genre_partitions.running(genre_code)
+        if running:
+            picked[genre_code] = running[-1]
+    if not picked:
+        return []
+    performances = {perf.id: perf for perf in db.query(PerformanceDB).filter(PerformanceDB.id.in_(picked.values()))}
+    return [performances[id] for id in picked.values() if id in performances]
 
 @router.get("/popular-by-genre", response_model=List[Performance])
-async def get_popular_by_genre():
+async def get_popular_by_genre(db: Session = Depends(get_db)):
     """
         ## 장르별로 공연 1개 반환
-        ### stdate / eddate 수정 필요!
     """
-    popular_performances = []
-    base_url = "http://kopis.or.kr/openApi/restful/pblprfr"
-    
-    for genre_code, genre_name in GENRE_CODE_MAP.items():
-        params = {
-            "service": KOPIS_API_KEY,
-            "stdate": "20240930",  # 시작일
-            "eddate": "20240930",  # 종료일
-            "cpage": "1",
-            "rows": "1",
-            "shcate": genre_code
-        }
-        
-        try:
-            performances = await fetch_kopis_data(base_url, params)
-            if performances:
-                popular_performances.extend(performances)
-        except HTTPException as e:
-            print(f"Error fetching data for genre {genre_name}: {str(e)}")
-    
-    return popular_performances
+    await fresh_genre_partitions(db)
+    performances = await run_db(list_popular_by_genre, db)
+    return [Performance.from_orm(perf) for perf in performances]
+
+def list_user_picks(db: Session, user_key: int) -> List[str]:
+    return list(db.scalars(select(UserPick.performance_id).where(UserPick.user_key == user_key)))
+
+def replace_user_picks(db: Session, user_key: int, performance_ids: List[str]):
+    """선택한 장르로 바꿉니다. 있는 장르인지는 한 번에 확인하고, 기존 선택과 달라진 것만 삭제/추가합니다."""
+    genre_codes = {perf_id: resolve_genre(perf_id) for perf_id in dict.fromkeys(performance_ids)}
+    stored_codes = existing_keys(db, PerformanceDB.genre_code, [code for code in genre_codes.values() if code])
+    picks = [perf_id for perf_id, code in genre_codes.items() if code in stored_codes]
+
+    current = set(list_user_picks(db, user_key))
+    removed = current.difference(picks)
+    if removed:
+        db.execute(delete(UserPick).where(UserPick.user_key == user_key, UserPick.performance_id.in_(removed)))
+    bulk_upsert(db, UserPick, [
+        dict(user_key=user_key, performance_id=perf_id) for perf_id in picks if perf_id not in current
+    ], ["user_key", "performance_id"], update_columns=[])
+    db.commit()
 
 @router.post("/user-picks")
 async def save_user_picks(
     input_data: UserPicksInput,
     credentials: HTTPAuthorizationCredentials = Security(security),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """
         ## Token 기반 사용자 공연 Pick 저장
@@ -79,20 +73,8 @@ async def save_user_picks(
     
 
     token = verify_token(credentials.credentials)
-    print(token)
-
-    # 기존 선택 삭제
-    db.query(UserPick).filter(UserPick.token == token).delete()
-
-    # 새로운 선택 저장
-    for perf_id in input_data.performance_ids:
-        print(perf_id)
-        performance = db.query(PerformanceDB).filter(PerformanceDB.genrenm == perf_id).first()
-        if performance:
-            new_pick = UserPick(token=token, performance_id=perf_id)
-            db.add(new_pick)
-    
-    db.commit()
+
+    await run_db(replace_user_picks, db, user_key_of(token), input_data.performance_ids)
     return {"message": "User picks saved successfully"}
 
 @router.get("/user-picks")
@@ -105,52 +87,13 @@ async def get_user_picks(
     """
     token = verify_token(credentials.credentials)
 
-    user_picks = db.query(UserPick).filter(UserPick.token == token).all()
-    performance_ids = [pick.performance_id for pick in user_picks]
-
-    return performance_ids
+    return await run_db(list_user_picks, db, user_key_of(token))
 
 @router.post("/token")
 async def generate_token():
     token = create_token()
     return {"token": token}
 
-def parse_kopis_xml(xml_string: str) -> List[Performance]:
-    root = ET.fromstring(xml_string)
-    performances = []
-
-    for item in root.findall('.//db'):
-        performance_data = {}
-        for child in item:
-            performance_data[child.tag] = child.text
-
-        # 날짜 파싱 및 문자열로 변환
-        try:
-            prfpdfrom = datetime.strptime(performance_data.get('prfpdfrom', ''), '%Y.%m.%d').strftime('%Y-%m-%d')
-        except ValueError:
-            prfpdfrom = None
-
-        try:
-            prfpdto = datetime.strptime(performance_data.get('prfpdto', ''), '%Y.%m.%d').strftime('%Y-%m-%d')
-        except ValueError:
-            prfpdto = None
-
-        performance = Performance(
-            mt20id=performance_data.get('mt20id', ''),
-            prfnm=performance_data.get('prfnm', ''),
-            prfpdfrom=prfpdfrom,
-            prfpdto=prfpdto,
-            fcltynm=performance_data.get('fcltynm', ''),
-            poster=performance_data.get('poster', ''),
-            genrenm=performance_data.get('genrenm', ''),
-            prfstate=performance_data.get('prfstate', ''),
-            openrun=performance_data.get('openrun', ''),
-            area=performance_data.get('area', '')
-        )
-        performances.append(performance)
-
-    return performances
-
 # @router.get("/recommended-shows", response_model=List[schemas.Performance])
 # def get_recommended_shows(token: str, db: Session = Depends(get_db)):
 #     user = db.query(models.User).filter(models.User.token == token).first()
@@ -168,29 +111,39 @@ def parse_kopis_xml(xml_string: str) -> List[Performance]:
     
 #     return recommended_shows
 
+def recommend_shows(db: Session, user_key: int) -> Optional[Dict[str, List[PerformanceDB]]]:
+    """사용자가 선택한 장르별로 예정 공연을 무작위 추천합니다. 선택한 장르가 없으면 None"""
+    user_picks = list_user_picks(db, user_key)
+    if not user_picks:
+        return None
+
+    # 장르별 후보(genre_partitions)에서 뽑은 뒤 공연 정보는 한 번에 조회
+    sampled = {}
+    for genre in user_picks:
+        genre_code = resolve_genre(genre)
+        if genre_code and genre_code not in sampled:
+            sampled[genre_code] = genre_partitions.sample_upcoming(genre_code, RECOMMENDED_SHOWS_PER_GENRE)
+
+    ids = [id for genre_ids in sampled.values() for id in genre_ids]
+    performances = {perf.id: perf for perf in db.query(PerformanceDB).filter(PerformanceDB.id.in_(ids))} if ids else {}
+    return {
+        GENRE_CODE_MAP[genre_code]: [performances[id] for id in genre_ids if id in performances]
+        for genre_code, genre_ids in sampled.items() if genre_ids
+    }
+
 @router.get("/recommended-shows", response_model=RecommendedShows)
-def get_recommended_shows(credentials: HTTPAuthorizationCredentials = Security(security), db: Session = Depends(get_db)):
+async def get_recommended_shows(credentials: HTTPAuthorizationCredentials = Security(security), db: Session = Depends(get_db)):
     """
         ## 공연 Pick에 따른 추천 공연 리스트
     """
     # 토큰으로 사용자가 선택한 장르 가져오기
     token = verify_token(credentials.credentials)
-    user_picks = db.query(models.UserPick).filter(models.UserPick.token == token).all()
-    if not user_picks:
+    await fresh_genre_partitions(db)
+    recommended_shows = await run_db(recommend_shows, db, user_key_of(token))
+    if recommended_shows is None:
         raise HTTPException(status_code=404, detail="User picks not found")
-    
-    selected_genres = list(set([pick.performance_id for pick in user_picks]))
-    
-    recommended_shows = []
-    for genre in selected_genres:
-        genre_shows = db.query(models.PerformanceDB).filter(
-            models.PerformanceDB.genrenm == genre,
-            models.PerformanceDB.prfpdfrom >= func.current_date()
-        ).order_by(func.random()).limit(10).all()
-        
-        recommended_shows.extend(genre_shows)
 
     return RecommendedShows(root={
         genre: [Performance.from_orm(show) for show in shows]
-        for genre, shows in itertools.groupby(recommended_shows, key=lambda x: x.genrenm)
-    })
\ No newline at end of file
+        for genre, shows in recommended_shows.items()
+    })
@@ -0,0 +1,258 @@
+import bisect
+import heapq
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import SYNC_GENERATION_CHECK_INTERVAL
+from database import ReadSessionLocal
+from models import PerformanceDB
+from utils import GenerationWatcher, get_sync_generation
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JONGSEONG = ["", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ", "ㄹㅍ", "ㄹㅎ",
+             "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+_CHOSEONG_SET = set(CHOSEONG)
+_HANGUL_FIRST = 0xAC00
+_HANGUL_LAST = 0xD7A3
+
+
+def choseong(ch: str) -> str:
+    """한글 음절이면 초성(호환 자모)을, 아니면 그대로 반환합니다. ("햄" -> "ㅎ")"""
+    code = ord(ch)
+    if _HANGUL_FIRST <= code <= _HANGUL_LAST:
+        return CHOSEONG[(code - _HANGUL_FIRST) // 588]
+    return ch
+
+def normalize(text: str) -> str:
+    # 띄어쓰기와 대소문자는 구분하지 않음 ("오페라의유령" == "오페라의 유령")
+    return "".join(text.split()).lower()
+
+def to_choseong(text: str) -> str:
+    return "".join(choseong(ch) for ch in text)
+
+def to_consonants(text: str) -> str:
+    """모음을 뺀 자음 뼈대. 받침까지 이어서 입력하는 경우를 위해 사용합니다. ("햄릿" -> "ㅎㅁㄹㅅ")"""
+    result = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_FIRST <= code <= _HANGUL_LAST:
+            result.append(CHOSEONG[(code - _HANGUL_FIRST) // 588] + JONGSEONG[(code - _HANGUL_FIRST) % 28])
+        else:
+            result.append(ch)
+    return "".join(result)
+
+def ngrams(text: str) -> Set[str]:
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+def _char_matches(query_ch: str, title_ch: str) -> bool:
+    return query_ch == title_ch or (query_ch in _CHOSEONG_SET and choseong(title_ch) == query_ch)
+
+def find(query: str, title: str) -> int:
+    """query가 title에 나오는 첫 위치. 질의의 초성 자모는 같은 초성의 음절과 일치합니다. ("ㅎㅁㄹ" in "햄릿")"""
+    if not any(ch in _CHOSEONG_SET for ch in query):
+        return title.find(query)
+    for start in range(len(title) - len(query) + 1):
+        if all(_char_matches(q, t) for q, t in zip(query, title[start:start + len(query)])):
+            return start
+    return -1
+
+# 인덱스 갱신 전용 스레드 (갱신하는 동안 요청을 처리하는 db_executor 스레드를 잡지 않도록 분리)
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autocomplete")
+
+def _first_position(*positions: int) -> int:
+    found = [position for position in positions if position >= 0]
+    return min(found) if found else -1
+
+class Entry(NamedTuple):
+    id: int
+    prfnm: str
+    norm: str
+    cho: str
+    consonants: str
+    prfpdfrom: date
+    prfpdto: date
+
+class AutocompleteIndex:
+    """
+    공연명 자동완성용 메모리 인덱스.
+
+    - 정렬된 (정규화 공연명) / (초성) / (자음 뼈대) 배열에서 이분 탐색으로 접두어 일치를 먼저 찾고
+    - 부족하면 1/2-gram 역색인 후보 중 부분 문자열 일치를 찾습니다.
+    자음만 입력하면 초성("ㅎㄹ")과 자음 뼈대("ㅎㅁㄹ") 모두 "햄릿"과 일치하고,
+    "햄ㄹ"처럼 음절과 섞이면 자모 자리를 같은 초성의 음절과 비교합니다.
+    항목마다 공연 기간을 가지고 있어 기간 겹침 조건으로 거릅니다.
+    """
+
+    def __init__(self, check_interval: float = SYNC_GENERATION_CHECK_INTERVAL):
+        self._lock = threading.RLock()
+        self._pending_lock = threading.Lock()
+        self._pending: Optional[Future] = None
+        self._entries: Dict[int, Entry] = {}
+        self._grams: Dict[str, Set[int]] = {}
+        self._by_norm: List[Tuple[str, int]] = []
+        self._by_cho: List[Tuple[str, int]] = []
+        self._by_consonants: List[Tuple[str, int]] = []
+        self._loaded_since: Optional[date] = None
+        self.watcher = GenerationWatcher(check_interval)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def ready(self) -> bool:
+        """처음 만들기가 끝났는지 여부"""
+        return self._loaded_since is not None
+
+    @staticmethod
+    def _entry_grams(entry: Entry) -> Set[str]:
+        return ngrams(entry.norm) | ngrams(entry.cho) | ngrams(entry.consonants)
+
+    def _add_grams(self, entry: Entry):
+        for gram in self._entry_grams(entry):
+            self._grams.setdefault(gram, set()).add(entry.id)
+
+    def _remove_grams(self, entry: Entry):
+        for gram in self._entry_grams(entry):
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(entry.id)
+                if not ids:
+                    del self._grams[gram]
+
+    def upsert(self, rows) -> int:
+        """(id, prfnm, prfpdfrom, prfpdto) 행을 추가하거나 갱신하고, 바뀐 항목 수를 반환합니다."""
+        with self._lock:
+            changes = []
+            for id, prfnm, prfpdfrom, prfpdto in rows:
+                norm = normalize(prfnm or "")
+                entry = Entry(id, prfnm or "", norm, to_choseong(norm), to_consonants(norm), prfpdfrom or date.min, prfpdto or date.max)
+                old = self._entries.get(id)
+                if old == entry:
+                    continue
+                if old is not None:
+                    self._remove_grams(old)
+                self._entries[id] = entry
+                self._add_grams(entry)
+                changes.append((old, entry))
+
+            # 조금만 바뀌었으면 정렬 배열에서 해당 항목만 교체하고, 많이 바뀌었으면 다시 정렬
+            if len(changes) * 20 > len(self._entries):
+                self._by_norm = sorted((entry.norm, entry.id) for entry in self._entries.values())
+                self._by_cho = sorted((entry.cho, entry.id) for entry in self._entries.values())
+                self._by_consonants = sorted((entry.consonants, entry.id) for entry in self._entries.values())
+            else:
+                for old, entry in changes:
+                    for keys, field in ((self._by_norm, "norm"), (self._by_cho, "cho"), (self._by_consonants, "consonants")):
+                        if old is not None:
+                            del keys[bisect.bisect_left(keys, (getattr(old, field), old.id))]
+                        bisect.insort(keys, (getattr(entry, field), entry.id))
+        return len(changes)
+
+    def refresh(self, db: Session, generation: Optional[str] = None) -> int:
+        """
+        마지막으로 불러온 날 이후 갱신된 공연만 다시 읽어 반영합니다.
+        (동기화는 바뀐 행의 last_updated를 오늘로 기록함)
+        """
+        today = date.today()
+        query = db.query(PerformanceDB.id, PerformanceDB.prfnm, PerformanceDB.prfpdfrom, PerformanceDB.prfpdto)
+        if self._loaded_since is not None:
+            query = query.filter(PerformanceDB.last_updated >= self._loaded_since)
+        changed = self.upsert(query.yield_per(5000))
+        self._loaded_since = today
+        self.watcher.mark(generation)
+        return changed
+
+    def _refresh_with_new_session(self) -> int:
+        db = ReadSessionLocal()
+        try:
+            # 세대를 변경분보다 먼저 읽으므로, 그 사이에 바뀐 데이터는 다음 확인 때 다시 반영됨
+            return self.refresh(db, get_sync_generation(db))
+        finally:
+            db.close()
+
+    def refresh_in_background(self) -> Future:
+        """변경분 반영을 전용 스레드에 맡깁니다. 이미 갱신 중이면 진행 중인 작업을 반환합니다."""
+        with self._pending_lock:
+            if self._pending is None or self._pending.done():
+                self._pending = _refresh_executor.submit(self._refresh_with_new_session)
+            return self._pending
+
+    def ensure_fresh(self, db: Session) -> Optional[Future]:
+        """
+        check_interval초마다 동기화 세대를 확인하고, 바뀌었으면 변경분을 백그라운드에서 반영합니다.
+        반영하는 동안에는 기존 인덱스로 응답하며, 갱신 중이면 그 작업(Future)을 반환합니다.
+        """
+        if self.watcher.poll(db) is not None:
+            return self.refresh_in_background()
+        with self._pending_lock:
+            if self._pending is not None and not self._pending.done():
+                return self._pending
+        return None
+
+    def search(self, query: str, start: Optional[date] = None, end: Optional[date] = None, limit: int = 10, offset: int = 0) -> List[Entry]:
+        """접두어 일치를 먼저(공연명 순), 그 다음 부분 일치를 일치 위치가 앞선 순서로 반환합니다."""
+        norm = normalize(query)
+        if not norm:
+            return []
+
+        needed = offset + limit
+        if all(ch in _CHOSEONG_SET for ch in norm):
+            # 자음만 입력: 초성 또는 자음 뼈대와 비교
+            arrays = [self._by_cho, self._by_consonants]
+            key = norm
+            position = lambda entry: _first_position(entry.cho.find(norm), entry.consonants.find(norm))
+        elif any(ch in _CHOSEONG_SET for ch in norm):
+            # 음절과 자모가 섞인 입력("햄ㄹ"): 초성으로 후보를 찾고 한 글자씩 확인
+            arrays = [self._by_cho]
+            key = to_choseong(norm)
+            position = lambda entry: find(norm, entry.norm)
+        else:
+            arrays = [self._by_norm]
+            key = norm
+            position = lambda entry: entry.norm.find(norm)
+
+        lower = start or date.min
+        upper = end or date.max
+
+        with self._lock:
+            entries = self._entries
+            results: List[Entry] = []
+            seen: Set[int] = set()
+
+            # 1) 접두어 일치: 정렬된 배열이므로 필요한 개수만큼만 읽음
+            for keys in arrays:
+                for index in range(bisect.bisect_left(keys, (key,)), len(keys)):
+                    if len(results) >= needed or not keys[index][0].startswith(key):
+                        break
+                    entry = entries[keys[index][1]]
+                    if entry.prfpdfrom <= upper and entry.prfpdto >= lower and entry.id not in seen and position(entry) == 0:
+                        results.append(entry)
+                        seen.add(entry.id)
+
+            # 2) 부분 문자열 일치: n-gram 역색인으로 후보를 좁힌 뒤 확인 (한 글자는 접두어만)
+            if len(results) < needed and len(key) > 1:
+                grams = {gram for gram in ngrams(key) if len(gram) == 2}
+                postings = sorted((self._grams.get(gram, set()) for gram in grams), key=len)
+                candidates = postings[0]
+                for posting in postings[1:]:
+                    candidates = candidates & posting
+                    if not candidates:
+                        break
+
+                # 후보가 많을 수 있으므로 값싼 기간 비교를 먼저 하고, 필요한 개수만 정렬
+                matches = []
+                for id in candidates:
+                    entry = entries[id]
+                    if entry.prfpdfrom <= upper and entry.prfpdto >= lower and id not in seen:
+                        found = position(entry)
+                        if found >= 0:
+                            matches.append((found, entry.norm, id))
+                results.extend(entries[id] for _, _, id in heapq.nsmallest(needed - len(results), matches))
+
+        return results[offset:needed]
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,158 @@
+"""
+체크포인트 기반 공연 상세정보 백필
+
+    cd app && python backfill.py start --stdate 20240101 --eddate 20241231
+    cd app && python backfill.py resume [--wait]
+    cd app && python backfill.py status
+
+start는 기간 내 공연 목록을 저장하면서 mt20id를 backfill_checkpoints 테이블에 pending으로 등록하고,
+resume은 pending과 재시도 시각이 된 failed 항목의 상세정보를 청크 단위로 가져와 커밋합니다.
+중간에 중단되어도 다시 resume 하면 남은 항목부터 이어서 진행합니다.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from bulk import bulk_upsert
+from config import BACKFILL_MAX_ATTEMPTS, BACKFILL_RETRY_BASE, BACKFILL_RETRY_MAX, KOPIS_MAX_WORKERS, SYNC_CHUNK_SIZE
+from models import BackfillCheckpoint, PerformanceDB, PerformanceDetailDB
+from utils import bump_sync_generation, chunked, content_hash, dedupe, fetch_from_kopis_sharded, fetch_many, fetch_performance_detail, performance_detail_row, performance_row
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKFILL_RETRY_MAX, BACKFILL_RETRY_BASE * (2 ** max(0, attempts - 1))))
+
+def start_backfill(db: Session, start_date, end_date, chunk_size: int = SYNC_CHUNK_SIZE) -> int:
+    """기간 내 공연 목록을 저장하고 상세정보가 필요한 mt20id를 체크포인트에 등록합니다."""
+    queued = 0
+    for chunk in chunked(fetch_from_kopis_sharded(start_date, end_date), chunk_size):
+        chunk = dedupe(chunk, 'mt20id')
+        now = datetime.now()
+        bulk_upsert(db, PerformanceDB, [{**performance_row(perf), 'content_hash': content_hash(perf)} for perf in chunk], 'mt20id')
+        # 이미 등록된 항목(완료/실패 포함)은 그대로 둠
+        bulk_upsert(db, BackfillCheckpoint, [
+            {'mt20id': perf['mt20id'], 'status': 'pending', 'attempts': 0, 'updated_at': now}
+            for perf in chunk
+        ], 'mt20id', update_columns=[])
+        db.commit()
+        queued += len(chunk)
+    if queued:
+        bump_sync_generation(db)
+    return queued
+
+def due_items(db: Session, limit: int, max_attempts: int = BACKFILL_MAX_ATTEMPTS) -> List[str]:
+    now = datetime.now()
+    rows = db.query(BackfillCheckpoint.mt20id).filter(or_(
+        BackfillCheckpoint.status == 'pending',
+        (BackfillCheckpoint.status == 'failed')
+        & (BackfillCheckpoint.attempts < max_attempts)
+        & (BackfillCheckpoint.next_attempt_at <= now)
+    )).order_by(BackfillCheckpoint.mt20id).limit(limit).all()
+    return [row.mt20id for row in rows]
+
+def next_retry_at(db: Session, max_attempts: int = BACKFILL_MAX_ATTEMPTS) -> Optional[datetime]:
+    return db.query(func.min(BackfillCheckpoint.next_attempt_at)).filter(
+        BackfillCheckpoint.status == 'failed',
+        BackfillCheckpoint.attempts < max_attempts
+    ).scalar()
+
+def resume_backfill(db: Session, max_workers: int = KOPIS_MAX_WORKERS, chunk_size: int = SYNC_CHUNK_SIZE,
+                    max_attempts: int = BACKFILL_MAX_ATTEMPTS, wait: bool = False) -> Dict[str, int]:
+    """
+    남은 항목의 상세정보를 가져옵니다. 청크마다 상세정보와 체크포인트를 함께 커밋하므로
+    중간에 중단되어도 처리한 만큼은 유지됩니다.
+    wait가 True이면 재시도 대기 중인 실패 항목이 남아 있는 동안 재시도 시각까지 기다립니다.
+    """
+    done = 0
+    failed = 0
+    while True:
+        mt20ids = due_items(db, chunk_size, max_attempts)
+        if not mt20ids:
+            retry_at = next_retry_at(db, max_attempts) if wait else None
+            if retry_at is None:
+                break
+            time.sleep(max(0.0, (retry_at - datetime.now()).total_seconds()))
+            continue
+
+        attempts = dict(db.query(BackfillCheckpoint.mt20id, BackfillCheckpoint.attempts).filter(BackfillCheckpoint.mt20id.in_(mt20ids)).all())
+        now = datetime.now()
+        detail_rows = []
+        checkpoints = []
+        for result in fetch_many(mt20ids, fetch_performance_detail, max_workers):
+            try:
+                if result.error is not None:
+                    raise result.error
+                detail_rows.append(performance_detail_row(result.value))
+                checkpoints.append({'mt20id': result.key, 'status': 'done', 'attempts': (attempts.get(result.key) or 0) + 1,
+                                    'last_error': None, 'next_attempt_at': None, 'updated_at': now})
+                done += 1
+            except Exception as e:
+                tries = (attempts.get(result.key) or 0) + 1
+                checkpoints.append({'mt20id': result.key, 'status': 'failed', 'attempts': tries,
+                                    'last_error': f"{type(e).__name__}: {e}", 'next_attempt_at': now + retry_delay(tries), 'updated_at': now})
+                failed += 1
+
+        bulk_upsert(db, PerformanceDetailDB, dedupe(detail_rows, 'mt20id'), 'mt20id')
+        bulk_upsert(db, BackfillCheckpoint, checkpoints, 'mt20id')
+        db.commit()
+        print(f"Backfill progress: {backfill_status(db)['counts']}")
+
+    return {"done": done, "failed": failed}
+
+def backfill_status(db: Session, max_attempts: int = BACKFILL_MAX_ATTEMPTS, sample: int = 10) -> dict:
+    counts = dict(db.query(BackfillCheckpoint.status, func.count()).group_by(BackfillCheckpoint.status).all())
+    exhausted = db.query(func.count()).select_from(BackfillCheckpoint).filter(
+        BackfillCheckpoint.status == 'failed', BackfillCheckpoint.attempts >= max_attempts
+    ).scalar()
+    failures = db.query(BackfillCheckpoint).filter(BackfillCheckpoint.status == 'failed').order_by(BackfillCheckpoint.updated_at.desc()).limit(sample).all()
+    retry_at = next_retry_at(db, max_attempts)
+    return {
+        "counts": {status: counts.get(status, 0) for status in ("pending", "done", "failed")},
+        "exhausted": exhausted,
+        "next_retry_at": retry_at.isoformat() if retry_at else None,
+        "recent_failures": [
+            {"mt20id": item.mt20id, "attempts": item.attempts, "error": item.last_error}
+            for item in failures
+        ],
+    }
+
+def main():
+    import json
+    from database import Base, SessionLocal, engine
+    from migrations import run_migrations
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    start = subparsers.add_parser("start", help="기간 내 공연을 등록하고 백필 시작")
+    start.add_argument("--stdate", required=True, help="공연시작일자 (YYYYMMDD)")
+    start.add_argument("--eddate", required=True, help="공연종료일자 (YYYYMMDD)")
+    resume = subparsers.add_parser("resume", help="남은 항목 이어서 처리")
+    resume.add_argument("--wait", action="store_true", help="재시도 대기 중인 실패 항목이 없어질 때까지 기다림")
+    subparsers.add_parser("status", help="진행 상황 조회")
+    for sub in (start, resume):
+        sub.add_argument("--workers", type=int, default=KOPIS_MAX_WORKERS)
+        sub.add_argument("--chunk-size", type=int, default=SYNC_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    db = SessionLocal()
+    try:
+        if args.command == "start":
+            start_date = datetime.strptime(args.stdate, "%Y%m%d").date()
+            end_date = datetime.strptime(args.eddate, "%Y%m%d").date()
+            print(f"Queued {start_backfill(db, start_date, end_date, args.chunk_size)} performances")
+        if args.command in ("start", "resume"):
+            print(resume_backfill(db, args.workers, args.chunk_size, wait=getattr(args, "wait", False)))
+        print(json.dumps(backfill_status(db), ensure_ascii=False, indent=2))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+자동완성 인덱스 벤치마크: 인덱스 생성/부분 갱신 시간과 입력 종류별 검색 지연 (p50/p99)
+
+    cd app && python -m benchmarks.autocomplete --titles 100000
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from autocomplete import AutocompleteIndex, to_choseong, to_consonants
+
+WORDS = ["햄릿", "레미제라블", "오페라의 유령", "시카고", "맘마미아", "지킬 앤 하이드", "호두까기 인형", "백조의 호수",
+         "라이온 킹", "캣츠", "노트르담 드 파리", "빨래", "베토벤 교향곡", "말러", "Jazz Night", "The Phantom"]
+SYLLABLES = "가나다라마바사아자차카타파하한국서울시립극단콘서트뮤지컬연극무용발레오케스트라페스티벌"
+
+
+def make_rows(count: int, rng: random.Random):
+    start = date.today() - timedelta(days=365)
+    rows = []
+    for i in range(count):
+        title = f"{rng.choice(WORDS)} {''.join(rng.choices(SYLLABLES, k=rng.randint(2, 6)))} {i}"
+        prfpdfrom = start + timedelta(days=rng.randint(0, 730))
+        rows.append((i, title, prfpdfrom, prfpdfrom + timedelta(days=rng.randint(0, 90))))
+    return rows
+
+def make_queries(rows, rng: random.Random, count: int):
+    """입력 중인 상태를 흉내 내어 공연명 일부를 잘라 질의를 만듭니다."""
+    kinds = {
+        "prefix": lambda title: title[:rng.randint(1, 4)],
+        "substring": lambda title: title[rng.randint(1, 3):][:rng.randint(2, 4)],
+        "choseong": lambda title: to_choseong(title.replace(" ", ""))[:rng.randint(1, 4)],
+        "consonants": lambda title: to_consonants(title.replace(" ", ""))[:rng.randint(2, 4)],
+        "mixed": lambda title: title[:1] + to_choseong(title[1:3]),
+    }
+    return {kind: [make(rng.choice(rows)[1]) for _ in range(count)] for kind, make in kinds.items()}
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000, help="입력 종류별 질의 수")
+    parser.add_argument("--rows", type=int, default=10, help="페이지당 목록 수")
+    parser.add_argument("--changed", type=float, default=0.01, help="부분 갱신 시 바뀌는 비율")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = make_rows(args.titles, rng)
+    index = AutocompleteIndex()
+
+    started = time.perf_counter()
+    index.upsert(rows)
+    print(f"build: {args.titles} titles in {time.perf_counter() - started:.2f}s")
+
+    changed = [(id, title + " 앙코르", prfpdfrom, prfpdto) for id, title, prfpdfrom, prfpdto in rng.sample(rows, int(len(rows) * args.changed))]
+    started = time.perf_counter()
+    index.upsert(changed)
+    print(f"incremental: {len(changed)} changed titles in {time.perf_counter() - started:.2f}s")
+
+    today = date.today()
+    print(f"{'query':<12}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'hits':>8}")
+    for kind, queries in make_queries(rows, rng, args.queries).items():
+        timings = []
+        hits = 0
+        for query in queries:
+            started = time.perf_counter()
+            results = index.search(query, today, today + timedelta(days=30), limit=args.rows)
+            timings.append((time.perf_counter() - started) * 1000)
+            hits += bool(results)
+        print(f"{kind:<12}{statistics.median(timings):>10.3f}{percentile(timings, 99):>10.3f}{max(timings):>10.3f}{hits / len(queries):>8.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+동기화 DB 쓰기 벤치마크: 행 단위 조회 + ORM add (기존) vs bulk.bulk_upsert
+
+    cd app && python -m benchmarks.bulk_upsert --rows 50000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from bulk import bulk_upsert
+from database import Base
+from models import PerformanceDB
+from utils import chunked
+
+
+def make_rows(count: int):
+    start = date(2024, 1, 1)
+    return [
+        dict(
+            mt20id=f"PF{i:06d}",
+            prfnm=f"합성 공연 {i}",
+            prfpdfrom=start + timedelta(days=i % 365),
+            prfpdto=start + timedelta(days=i % 365 + 30),
+            fcltynm=f"공연장 {i % 500}",
+            poster=f"http://www.kopis.or.kr/upload/pfmPoster/PF_{i:06d}.gif",
+            genrenm="뮤지컬",
+            prfstate="공연중",
+            openrun="N",
+            area="서울특별시",
+            last_updated=start,
+        )
+        for i in range(count)
+    ]
+
+def write_per_row(db, rows, chunk_size):
+    for chunk in chunked(rows, chunk_size):
+        for row in chunk:
+            db_perf = db.query(PerformanceDB).filter(PerformanceDB.mt20id == row['mt20id']).first()
+            if not db_perf:
+                db.add(PerformanceDB(**row))
+                db.flush()
+            else:
+                for column, value in row.items():
+                    setattr(db_perf, column, value)
+        db.commit()
+
+def write_bulk(db, rows, chunk_size):
+    for chunk in chunked(rows, chunk_size):
+        bulk_upsert(db, PerformanceDB, chunk, 'mt20id')
+        db.commit()
+
+def run(name, writer, rows, chunk_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        statements = [0]
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count_statements(*args):
+            statements[0] += 1
+
+        Base.metadata.create_all(bind=engine, tables=[PerformanceDB.__table__])
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        for label in ("insert", "update"):
+            statements[0] = 0
+            with Session() as db:
+                started = time.perf_counter()
+                writer(db, rows, chunk_size)
+                elapsed = time.perf_counter() - started
+            print(f"{name:<8} {label:<7} rows={len(rows):<7} {elapsed:8.2f} s  {len(rows) / elapsed:10,.0f} rows/s  statements={statements[0]}")
+        engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    run("per-row", write_per_row, rows, args.chunk_size)
+    run("bulk", write_bulk, rows, args.chunk_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+async 엔드포인트 DB 접근 벤치마크: 이벤트 루프에서 Session을 직접 사용 (기존) vs database.run_db
+
+    cd app && python -m benchmarks.db_concurrency --rows 200000 --concurrency 32 --slow-ratio 0.1
+
+느린 쿼리(LIKE 전체 스캔 count)와 빠른 쿼리(기본키 조회)를 섞어 동시에 요청하고
+전체 처리량과 빠른 요청의 지연 시간을 비교합니다. 요청은 httpx ASGITransport로 같은 이벤트 루프에서 처리됩니다.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks.bulk_upsert import make_rows
+from bulk import bulk_upsert
+from config import DB_EXECUTOR_WORKERS
+from database import Base, create_db_engine, run_db
+from models import PerformanceDB
+from utils import chunked
+
+
+def slow_query(db: Session) -> int:
+    return db.query(func.count()).select_from(PerformanceDB).filter(PerformanceDB.prfnm.like("%공연 1%7%")).scalar()
+
+def fast_query(db: Session, id: int) -> str:
+    return db.get(PerformanceDB, id).prfnm
+
+def create_app(Session_) -> FastAPI:
+    app = FastAPI()
+
+    def get_session():
+        db = Session_()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @app.get("/inline/slow")
+    async def inline_slow(db: Session = Depends(get_session)):
+        return slow_query(db)
+
+    @app.get("/inline/fast/{id}")
+    async def inline_fast(id: int, db: Session = Depends(get_session)):
+        return fast_query(db, id)
+
+    @app.get("/run_db/slow")
+    async def run_db_slow(db: Session = Depends(get_session)):
+        return await run_db(slow_query, db)
+
+    @app.get("/run_db/fast/{id}")
+    async def run_db_fast(id: int, db: Session = Depends(get_session)):
+        return await run_db(fast_query, db, id)
+
+    return app
+
+async def load(app: FastAPI, mode: str, rows: int, concurrency: int, slow_ratio: float, duration: float, seed: int):
+    rng = random.Random(seed)
+    latencies = {"slow": [], "fast": []}
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(client: httpx.AsyncClient):
+        while time.perf_counter() < deadline:
+            kind = "slow" if rng.random() < slow_ratio else "fast"
+            path = f"/{mode}/slow" if kind == "slow" else f"/{mode}/fast/{rng.randint(1, rows)}"
+            started = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies[kind].append((time.perf_counter() - started) * 1000)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else float("nan")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--slow-ratio", type=float, default=0.1)
+    parser.add_argument("--duration", type=float, default=5.0, help="모드별 측정 시간(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_db_engine(url)
+        Base.metadata.create_all(bind=engine, tables=[PerformanceDB.__table__])
+        with sessionmaker(bind=engine)() as db:
+            for chunk in chunked(make_rows(args.rows), 5000):
+                bulk_upsert(db, PerformanceDB, chunk, 'mt20id')
+                db.commit()
+
+        read_engine = create_db_engine(url, read_only=True, pool_size=DB_EXECUTOR_WORKERS, max_overflow=args.concurrency)
+        app = create_app(sessionmaker(bind=read_engine, autoflush=False))
+
+        started = time.perf_counter()
+        with sessionmaker(bind=read_engine)() as db:
+            slow_query(db)
+        print(f"{args.rows} rows, slow query alone {(time.perf_counter() - started) * 1000:.1f}ms, "
+              f"concurrency {args.concurrency}, slow ratio {args.slow_ratio:.0%}, db threads {DB_EXECUTOR_WORKERS}")
+        print(f"{'mode':<8}{'req/s':>10}{'fast p50':>10}{'fast p99':>10}{'slow p50':>10}{'slow p99':>10}")
+        for mode in ("inline", "run_db"):
+            latencies, elapsed = asyncio.run(load(app, mode, args.rows, args.concurrency, args.slow_ratio, args.duration, args.seed))
+            total = len(latencies["slow"]) + len(latencies["fast"])
+            print(f"{mode:<8}{total / elapsed:>10.1f}"
+                  f"{statistics.median(latencies['fast']):>10.1f}{percentile(latencies['fast'], 99):>10.1f}"
+                  f"{statistics.median(latencies['slow']) if latencies['slow'] else float('nan'):>10.1f}{percentile(latencies['slow'], 99):>10.1f}")
+        read_engine.dispose()
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+로컬 KOPIS 대체 서버: pblprfr, pblprfr/{mt20id}, prfplc, prfplc/{mt10id}
+
+합성 카탈로그를 seed로부터 결정적으로 생성하며, 지연 시간과 오류(503) 주입을 지원합니다.
+
+    cd app && python -m benchmarks.fake_kopis --performances 100000 --facilities 3000 --port 8081
+    KOPIS_API_ROOT=http://127.0.0.1:8081/openApi/restful uvicorn main:app
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+API_PREFIX = "/openApi/restful"
+
+GENRES = {
+    "AAAA": "연극",
+    "BBBC": "무용(서양/한국무용)",
+    "BBBE": "대중무용",
+    "CCCA": "서양음악(클래식)",
+    "CCCC": "한국음악(국악)",
+    "CCCD": "대중음악",
+    "EEEA": "복합",
+    "EEEB": "서커스/마술",
+    "GGGA": "뮤지컬",
+}
+
+REGIONS = [
+    ("11", "서울특별시", "서울", ["종로구", "중구", "마포구", "강남구", "송파구"]),
+    ("26", "부산광역시", "부산", ["중구", "해운대구", "부산진구"]),
+    ("27", "대구광역시", "대구", ["중구", "수성구"]),
+    ("28", "인천광역시", "인천", ["남동구", "부평구"]),
+    ("41", "경기도", "경기", ["수원시", "성남시", "고양시"]),
+    ("50", "제주특별자치도", "제주", ["제주시", "서귀포시"]),
+]
+
+WORDS = ["햄릿", "레미제라블", "오페라의 유령", "시카고", "맘마미아", "지킬 앤 하이드", "호두까기 인형", "백조의 호수", "라이온 킹", "캣츠", "노트르담 드 파리", "빨래"]
+
+
+def _kopis_date(value: date) -> str:
+    return value.strftime("%Y.%m.%d")
+
+def _element(tag: str, value) -> str:
+    if value is None or value == "":
+        return f"<{tag}/>"
+    return f"<{tag}>{escape(str(value))}</{tag}>"
+
+def _record(fields: dict) -> str:
+    parts = []
+    for tag, value in fields.items():
+        if isinstance(value, list):
+            parts.append(f"<{tag}>" + "".join(value) + f"</{tag}>")
+        else:
+            parts.append(_element(tag, value))
+    return "<db>" + "".join(parts) + "</db>"
+
+class FakeCatalog:
+    """공연/시설 합성 카탈로그. 레코드는 인덱스와 seed로부터 필요할 때 생성합니다."""
+
+    def __init__(self, performances: int = 10000, facilities: int = 1000, seed: int = 0, today: Optional[date] = None):
+        self.performance_count = performances
+        self.facility_count = max(1, facilities)
+        self.seed = seed
+        self.today = today or date.today()
+
+        # 기간 필터와 페이지 처리를 위해 날짜/장르만 미리 계산
+        rng = random.Random(seed)
+        origin = self.today - timedelta(days=365)
+        self._starts: List[date] = []
+        self._ends: List[date] = []
+        self._genres: List[str] = []
+        self._id_cache = {}
+        codes = list(GENRES)
+        for _ in range(performances):
+            start = origin + timedelta(days=rng.randrange(730))
+            self._starts.append(start)
+            self._ends.append(start + timedelta(days=rng.choice([0, 1, 2, 7, 14, 30, 60, 120])))
+            self._genres.append(rng.choice(codes))
+
+    def mt20id(self, index: int) -> str:
+        return f"PF{index:06d}"
+
+    def mt10id(self, index: int) -> str:
+        return f"FC{index:06d}"
+
+    def facility_index(self, index: int) -> int:
+        return (index * 7919 + self.seed) % self.facility_count
+
+    def region(self, facility_index: int):
+        return REGIONS[facility_index % len(REGIONS)]
+
+    def prfstate(self, index: int) -> str:
+        if self._starts[index] > self.today:
+            return "공연예정"
+        if self._ends[index] < self.today:
+            return "공연완료"
+        return "공연중"
+
+    def performance_ids(self, start: date, end: date, genre_code: Optional[str] = None) -> List[int]:
+        # 같은 기간의 다음 페이지 요청마다 전체를 다시 훑지 않도록 기억해 둠
+        key = (start, end, genre_code)
+        if key not in self._id_cache:
+            self._id_cache[key] = [
+                i for i in range(self.performance_count)
+                if self._starts[i] <= end and self._ends[i] >= start and (genre_code is None or self._genres[i] == genre_code)
+            ]
+        return self._id_cache[key]
+
+    def performance_list_fields(self, index: int) -> dict:
+        facility = self.facility_index(index)
+        rng = random.Random(self.seed * 1000003 + index)
+        return {
+            "mt20id": self.mt20id(index),
+            "prfnm": f"{rng.choice(WORDS)} {index}",
+            "prfpdfrom": _kopis_date(self._starts[index]),
+            "prfpdto": _kopis_date(self._ends[index]),
+            "fcltynm": f"합성공연장 {facility}",
+            "poster": f"http://www.kopis.or.kr/upload/pfmPoster/PF_{self.mt20id(index)}.gif",
+            "area": self.region(facility)[1],
+            "genrenm": GENRES[self._genres[index]],
+            "openrun": "Y" if index % 17 == 0 else "N",
+            "prfstate": self.prfstate(index),
+        }
+
+    def performance_detail_fields(self, index: int) -> dict:
+        fields = self.performance_list_fields(index)
+        facility = self.facility_index(index)
+        return {
+            "mt20id": fields["mt20id"],
+            "mt10id": self.mt10id(facility),
+            "prfnm": fields["prfnm"],
+            "prfpdfrom": fields["prfpdfrom"],
+            "prfpdto": fields["prfpdto"],
+            "fcltynm": fields["fcltynm"],
+            "prfcast": "배우1, 배우2, 배우3",
+            "prfcrew": "연출가",
+            "prfruntime": "2시간 30분",
+            "prfage": "만 7세 이상",
+            "entrpsnm": "합성기획사",
+            "pcseguidance": "R석 150,000원, S석 120,000원",
+            "poster": fields["poster"],
+            "sty": "합성 줄거리 " * 20,
+            "area": fields["area"],
+            "genrenm": fields["genrenm"],
+            "openrun": fields["openrun"],
+            "prfstate": fields["prfstate"],
+            "styurls": [_element("styurl", f"http://www.kopis.or.kr/upload/pfmIntroImage/PF_{fields['mt20id']}_{j}.jpg") for j in range(3)],
+            "dtguidance": "화요일 ~ 금요일(20:00), 토요일 ~ 일요일(14:00,18:00)",
+            "relates": ["<relate>" + _element("relatenm", "합성예매처") + _element("relateurl", "http://example.com") + "</relate>"],
+        }
+
+    def facility_list_fields(self, index: int) -> dict:
+        _, _, sidonm, guguns = self.region(index)
+        return {
+            "fcltynm": f"합성공연장 {index}",
+            "mt10id": self.mt10id(index),
+            "mt13cnt": 1 + index % 3,
+            "fcltychartr": "기타(공공)" if index % 2 else "민간(대학로)",
+            "sidonm": sidonm,
+            "gugunnm": guguns[index % len(guguns)],
+            "opende": str(1980 + index % 40),
+        }
+
+    def facility_detail_fields(self, index: int) -> dict:
+        fields = self.facility_list_fields(index)
+        rng = random.Random(self.seed * 7919 + index)
+        return {
+            **fields,
+            "seatscale": 100 + index % 1500,
+            "telno": "02-000-0000",
+            "relateurl": "http://example.com",
+            "adres": f"{fields['sidonm']} {fields['gugunnm']} 합성로 {index}",
+            "la": round(33.2 + rng.random() * 5.0, 6),
+            "lo": round(126.1 + rng.random() * 3.3, 6),
+            "mt13s": ["<mt13>" + _element("prfplcnm", "대극장") + _element("seatscale", 500) + "</mt13>"],
+        }
+
+class FakeKopisServer:
+    def __init__(self, catalog: FakeCatalog, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0):
+        self.catalog = catalog
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = Counter()
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(catalog.seed)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def api_root(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    @property
+    def request_count(self) -> int:
+        return sum(self.requests.values())
+
+    def start(self) -> "FakeKopisServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 헤더와 본문을 따로 쓰므로 keep-alive에서 Nagle + delayed ACK 지연이 생기지 않도록 함
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, body = server.respond(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", "text/xml; charset=UTF-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def respond(self, raw_path: str):
+        url = urlparse(raw_path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else url.path
+        parts = [part for part in path.split("/") if part]
+        endpoint = parts[0] if parts else ""
+        endpoint_key = f"{endpoint}/{{id}}" if len(parts) > 1 else endpoint
+
+        with self._lock:
+            self.requests[endpoint_key] += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return 503, b"<error>Service Unavailable</error>"
+
+        try:
+            if endpoint == "pblprfr" and len(parts) == 1:
+                return 200, self._performance_list(params)
+            if endpoint == "pblprfr" and len(parts) == 2:
+                return 200, self._detail(self.catalog.performance_detail_fields, parts[1], "PF", self.catalog.performance_count)
+            if endpoint == "prfplc" and len(parts) == 1:
+                return 200, self._facility_list(params)
+            if endpoint == "prfplc" and len(parts) == 2:
+                return 200, self._detail(self.catalog.facility_detail_fields, parts[1], "FC", self.catalog.facility_count)
+        except (KeyError, ValueError) as e:
+            return 400, f"<error>{escape(str(e))}</error>".encode("utf-8")
+        return 404, b"<error>Not Found</error>"
+
+    @staticmethod
+    def _page(ids: List, params: dict) -> List:
+        cpage = max(1, int(params.get("cpage", 1)))
+        rows = max(1, int(params.get("rows", 10)))
+        return ids[(cpage - 1) * rows:cpage * rows]
+
+    @staticmethod
+    def _document(records: List[str]) -> bytes:
+        return ("<?xml version=\"1.0\" encoding=\"UTF-8\"?><dbs>" + "".join(records) + "</dbs>").encode("utf-8")
+
+    def _performance_list(self, params: dict) -> bytes:
+        start = date(*map(int, (params["stdate"][:4], params["stdate"][4:6], params["stdate"][6:8])))
+        end = date(*map(int, (params["eddate"][:4], params["eddate"][4:6], params["eddate"][6:8])))
+        ids = self.catalog.performance_ids(start, end, params.get("shcate"))
+        return self._document([_record(self.catalog.performance_list_fields(i)) for i in self._page(ids, params)])
+
+    def _facility_list(self, params: dict) -> bytes:
+        ids = list(range(self.catalog.facility_count))
+        if params.get("signgucode"):
+            ids = [i for i in ids if self.catalog.region(i)[0] == params["signgucode"]]
+        return self._document([_record(self.catalog.facility_list_fields(i)) for i in self._page(ids, params)])
+
+    def _detail(self, fields, key: str, prefix: str, count: int) -> bytes:
+        if not key.startswith(prefix) or not key[len(prefix):].isdigit() or int(key[len(prefix):]) >= count:
+            return self._document([])
+        return self._document([_record(fields(int(key[len(prefix):])))])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--performances", type=int, default=10000)
+    parser.add_argument("--facilities", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="요청당 지연 시간(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연 시간 편차(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    args = parser.parse_args()
+
+    catalog = FakeCatalog(args.performances, args.facilities, args.seed)
+    server = FakeKopisServer(catalog, args.host, args.port, args.latency, args.jitter, args.error_rate)
+    print(f"Fake KOPIS serving {args.performances} performances / {args.facilities} facilities at {server.api_root}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+/recommended-shows 벤치마크: 장르별 ORDER BY random() 쿼리 (기존) vs genre_partitions 후보에서 뽑기
+
+    cd app && python -m benchmarks.recommendations --sizes 10000 100000 300000 --genres 3
+
+카탈로그 크기별로 사용자 한 명(선택 장르 --genres개)의 추천 목록을 만드는 시간(p50/p99)을 비교합니다.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from bulk import bulk_upsert
+from database import Base, create_db_engine
+from genre_codes import GENRE_CODE_MAP
+from genre_partitions import GenrePartitions
+from models import PerformanceDB
+from utils import chunked
+
+PER_GENRE = 10
+
+
+def make_rows(count: int, rng: random.Random):
+    start = date.today() - timedelta(days=365)
+    codes = list(GENRE_CODE_MAP)
+    for i in range(count):
+        code = rng.choice(codes)
+        prfpdfrom = start + timedelta(days=rng.randint(0, 730))
+        yield dict(
+            mt20id=f"PF{i:07d}",
+            prfnm=f"합성 공연 {i}",
+            prfpdfrom=prfpdfrom,
+            prfpdto=prfpdfrom + timedelta(days=rng.randint(0, 90)),
+            genrenm=GENRE_CODE_MAP[code],
+            genre_code=code,
+            prfstate="공연중",
+            last_updated=start,
+        )
+
+def order_by_random(db, genre_codes):
+    result = {}
+    for genre_code in genre_codes:
+        result[genre_code] = db.query(PerformanceDB).filter(
+            PerformanceDB.genre_code == genre_code,
+            PerformanceDB.prfpdfrom >= func.current_date()
+        ).order_by(func.random()).limit(PER_GENRE).all()
+    return result
+
+def from_partitions(db, partitions: GenrePartitions, genre_codes):
+    sampled = {genre_code: partitions.sample_upcoming(genre_code, PER_GENRE) for genre_code in genre_codes}
+    ids = [id for genre_ids in sampled.values() for id in genre_ids]
+    performances = {perf.id: perf for perf in db.query(PerformanceDB).filter(PerformanceDB.id.in_(ids))}
+    return {genre_code: [performances[id] for id in genre_ids] for genre_code, genre_ids in sampled.items()}
+
+def measure(fn, rng: random.Random, genres: int, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        genre_codes = rng.sample(list(GENRE_CODE_MAP), genres)
+        started = time.perf_counter()
+        fn(genre_codes)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--genres", type=int, default=3, help="사용자가 선택한 장르 수")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}{'pool build':>12}{'random() p50':>14}{'p99':>8}{'pool p50':>10}{'p99':>8}")
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            Base.metadata.create_all(bind=engine, tables=[PerformanceDB.__table__])
+            with sessionmaker(bind=engine)() as db:
+                for chunk in chunked(make_rows(size, rng), 5000):
+                    bulk_upsert(db, PerformanceDB, chunk, 'mt20id')
+                    db.commit()
+
+                partitions = GenrePartitions()
+                started = time.perf_counter()
+                partitions.refresh(db)
+                build = (time.perf_counter() - started) * 1000
+
+                random_p50, random_p99 = measure(lambda codes: order_by_random(db, codes), rng, args.genres, args.repeat)
+                pool_p50, pool_p99 = measure(lambda codes: from_partitions(db, partitions, codes), rng, args.genres, args.repeat)
+            engine.dispose()
+        print(f"{size:>8}{build:>10.1f}ms{random_p50:>12.2f}ms{random_p99:>6.2f}ms{pool_p50:>8.2f}ms{pool_p99:>6.2f}ms")
+
+if __name__ == "__main__":
+    main()
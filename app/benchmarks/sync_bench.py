@@ -0,0 +1,104 @@
+"""
+로컬 KOPIS 대체 서버(benchmarks.fake_kopis)를 상대로 동기화 전체 경로를 측정합니다.
+
+    cd app && python -m benchmarks.sync_bench --performances 20000 --facilities 2000 --latency 0.02 --workers 16
+
+update_database / update_facilities_database를 임시 SQLite DB에 대해 실행하고
+처리량(records/s), KOPIS 요청 수, 프로세스 최대 RSS를 출력합니다.
+--tracemalloc을 주면 작업별 파이썬 힙 최대 사용량을 측정합니다. (처리량은 크게 낮아짐)
+--runs 2 이상이면 두 번째 실행부터는 변경 감지로 건너뛰는 증분 동기화를 측정합니다.
+--cache-mode record로 한 번 실행한 뒤 --cache-mode replay로 실행하면 같은 KOPIS 응답으로 반복 측정합니다.
+
+    cd app && python -m benchmarks.sync_bench --cache-mode record --cache-path ./sync_bench_cache.db
+    cd app && python -m benchmarks.sync_bench --cache-mode replay --cache-path ./sync_bench_cache.db
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmarks.fake_kopis import FakeCatalog, FakeKopisServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--performances", type=int, default=5000)
+    parser.add_argument("--facilities", type=int, default=500)
+    parser.add_argument("--days", type=int, default=30, help="동기화할 기간(오늘부터 일 수)")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--shard-days", type=int, default=0, help="목록을 n일 단위로 나눠 동시에 조회 (0이면 한 번에 조회)")
+    parser.add_argument("--rows", type=int, default=1000, help="목록 요청의 페이지당 행 수")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rate-limit", type=float, default=0, help="초당 KOPIS 요청 수 제한 (0이면 제한 없음)")
+    parser.add_argument("--tracemalloc", action="store_true", help="작업별 파이썬 힙 최대 사용량 측정")
+    parser.add_argument("--cache-mode", choices=("off", "on", "record", "replay"), default="off", help="KOPIS 응답 캐시 모드 (record로 저장한 응답을 replay로 재사용)")
+    parser.add_argument("--cache-path", default=None, help="KOPIS 응답 캐시 파일 (기본값은 실행마다 지워지는 임시 파일)")
+    args = parser.parse_args()
+
+    catalog = FakeCatalog(args.performances, args.facilities, args.seed)
+    with FakeKopisServer(catalog, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        # config는 import 시점에 환경 변수를 읽으므로 서버를 띄운 뒤에 불러옴
+        os.environ["KOPIS_API_ROOT"] = server.api_root
+        os.environ["KOPIS_CACHE_MODE"] = args.cache_mode
+        os.environ["KOPIS_CACHE_PATH"] = args.cache_path or os.path.join(tmp, "kopis_cache.db")
+        os.environ["KOPIS_RATE_LIMIT"] = str(args.rate_limit)
+        os.environ["KOPIS_RATE_LIMIT_PATH"] = os.path.join(tmp, "rate_limit.db")
+
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from database import Base
+        from migrations import run_migrations
+        from utils import fetch_facilities_from_kopis, fetch_from_kopis, fetch_from_kopis_sharded, update_database, update_facilities_database
+
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        start = date.today()
+        end = start + timedelta(days=args.days)
+        print(f"fake KOPIS at {server.api_root}: {args.performances} performances, {args.facilities} facilities, "
+              f"latency={args.latency}s error_rate={args.error_rate}, workers={args.workers}, cache={args.cache_mode}")
+
+        def listing():
+            if args.shard_days > 0:
+                return fetch_from_kopis_sharded(start, end, args.shard_days, args.workers, rows=args.rows)
+            return fetch_from_kopis(start, end, rows=args.rows)
+
+        jobs = [
+            ("performances", lambda db: update_database(db, listing(), args.workers, args.chunk_size)),
+            ("facilities", lambda db: update_facilities_database(db, fetch_facilities_from_kopis(rows=args.rows), args.workers, args.chunk_size)),
+        ]
+        for run in range(1, args.runs + 1):
+            for name, job in jobs:
+                requests_before = server.request_count
+                if args.tracemalloc:
+                    tracemalloc.start()
+                started = time.perf_counter()
+                with Session() as db:
+                    result = job(db)
+                elapsed = time.perf_counter() - started
+                if args.tracemalloc:
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    memory = f"heap peak={peak / 1024 / 1024:6.1f} MiB"
+                else:
+                    memory = f"max rss={resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:6.1f} MiB"
+
+                print(f"run {run} {name:<13} records={result.processed:<7} written={result.written:<7} failed={len(result.failed):<5} "
+                      f"{elapsed:7.2f} s  {result.processed / elapsed if elapsed else 0:9,.0f} rec/s  "
+                      f"requests={server.request_count - requests_before:<7} {memory}")
+
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+KOPIS XML 파서 벤치마크: xmltodict 전체 파싱 vs kopis_xml.iter_kopis_records
+
+    cd app && python -m benchmarks.xml_parse --records 20000
+"""
+import argparse
+import time
+import tracemalloc
+from xml.sax.saxutils import escape
+
+import xmltodict
+
+from kopis_xml import iter_kopis_records
+
+
+def make_list_response(records: int) -> bytes:
+    parts = ["<?xml version=\"1.0\" encoding=\"UTF-8\"?><dbs>"]
+    for i in range(records):
+        parts.append(
+            "<db>"
+            f"<mt20id>PF{i:06d}</mt20id>"
+            f"<prfnm>{escape(f'합성 공연 {i} <뮤지컬>')}</prfnm>"
+            "<prfpdfrom>2024.10.01</prfpdfrom>"
+            "<prfpdto>2024.12.31</prfpdto>"
+            f"<fcltynm>공연장 {i % 500}</fcltynm>"
+            f"<poster>http://www.kopis.or.kr/upload/pfmPoster/PF_{i:06d}.gif</poster>"
+            "<area>서울특별시</area>"
+            "<genrenm>뮤지컬</genrenm>"
+            "<openrun>N</openrun>"
+            "<prfstate>공연중</prfstate>"
+            "<styurls>"
+            + "".join(f"<styurl>http://www.kopis.or.kr/upload/pfmIntroImage/PF_{i:06d}_{j}.jpg</styurl>" for j in range(3))
+            + "</styurls>"
+            "<relates><relate><relatenm>예매처</relatenm><relateurl>http://example.com</relateurl></relate></relates>"
+            "</db>"
+        )
+    parts.append("</dbs>")
+    return "".join(parts).encode("utf-8")
+
+def consume_xmltodict(content: bytes) -> int:
+    data = xmltodict.parse(content, encoding='utf-8')
+    records = data['dbs']['db']
+    if not isinstance(records, list):
+        records = [records]
+    return sum(1 for record in records if record['mt20id'])
+
+def consume_iterparse(content: bytes) -> int:
+    return sum(1 for record in iter_kopis_records(content) if record['mt20id'])
+
+def measure(name, fn, content, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = fn(content)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(timings)
+    print(f"{name:<12} records={count:<8} best={best * 1000:9.1f} ms  {count / best:12,.0f} rec/s  peak={peak / 1024 / 1024:8.1f} MiB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for records in args.records:
+        content = make_list_response(records)
+        print(f"--- {records} records, {len(content) / 1024 / 1024:.1f} MiB")
+        measure("xmltodict", consume_xmltodict, content, args.repeat)
+        measure("iterparse", consume_iterparse, content, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from sqlalchemy import distinct, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+
+def existing_keys(db: Session, column, keys: Iterable[str]) -> Set[str]:
+    """
+    keys 중 이미 저장된 값을 IN 쿼리 한 번으로 조회합니다.
+    유니크하지 않은 컬럼이면 같은 값의 행을 모두 가져오지 않도록 DISTINCT로 조회합니다.
+    """
+    keys = list(set(keys))
+    if not keys:
+        return set()
+    return set(db.scalars(select(distinct(column)).where(column.in_(keys))))
+
+def stored_values(db: Session, key_column, value_column, keys: Iterable[str]) -> Dict[str, object]:
+    """keys 중 이미 저장된 행의 {key: value}를 IN 쿼리 한 번으로 조회합니다."""
+    keys = list(set(keys))
+    if not keys:
+        return {}
+    return dict(db.execute(select(key_column, value_column).where(key_column.in_(keys))).all())
+
+def bulk_upsert(db: Session, model, rows: List[dict], key: Union[str, List[str]], update_columns: Optional[List[str]] = None):
+    """
+    rows를 INSERT ... ON CONFLICT(key) DO UPDATE 한 문장으로 기록합니다. (executemany)
+    key는 유니크 인덱스의 컬럼 이름(여러 컬럼이면 리스트)입니다.
+    update_columns를 빈 리스트로 주면 기존 행은 그대로 두고 새 행만 추가합니다.
+    """
+    if not rows:
+        return
+
+    keys = [key] if isinstance(key, str) else list(key)
+    stmt = insert(model.__table__)
+    if update_columns is None:
+        update_columns = [column for column in rows[0] if column not in keys]
+
+    if update_columns:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+
+    db.execute(stmt, rows)
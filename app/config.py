@@ -4,4 +4,69 @@ from dotenv import load_dotenv
 load_dotenv()
 
 KOPIS_API_KEY = os.getenv("KOPIS_API_KEY")
-KOPIS_BASE_URL = "http://www.kopis.or.kr/openApi/restful/pblprfr"
\ No newline at end of file
+KOPIS_API_ROOT = os.getenv("KOPIS_API_ROOT", "http://www.kopis.or.kr/openApi/restful")
+KOPIS_BASE_URL = f"{KOPIS_API_ROOT}/pblprfr"
+
+# 상세정보 동시 요청 수
+KOPIS_MAX_WORKERS = int(os.getenv("KOPIS_MAX_WORKERS", "8"))
+# 동기화 시 한 번에 처리/커밋할 레코드 수
+SYNC_CHUNK_SIZE = int(os.getenv("SYNC_CHUNK_SIZE", "500"))
+
+# KOPIS HTTP 클라이언트 (kopis_client.py)
+KOPIS_POOL_SIZE = int(os.getenv("KOPIS_POOL_SIZE", str(max(KOPIS_MAX_WORKERS, 10))))
+KOPIS_CONNECT_TIMEOUT = float(os.getenv("KOPIS_CONNECT_TIMEOUT", "5"))
+KOPIS_READ_TIMEOUT = float(os.getenv("KOPIS_READ_TIMEOUT", "30"))
+KOPIS_MAX_RETRIES = int(os.getenv("KOPIS_MAX_RETRIES", "4"))
+KOPIS_BACKOFF_BASE = float(os.getenv("KOPIS_BACKOFF_BASE", "0.5"))
+KOPIS_BACKOFF_MAX = float(os.getenv("KOPIS_BACKOFF_MAX", "20"))
+
+# KOPIS 응답 캐시 (kopis_cache.py)
+# off: 사용 안 함, on: TTL 내 캐시 사용, record: 항상 요청 후 저장, replay: 캐시만 사용(오프라인)
+KOPIS_CACHE_MODE = os.getenv("KOPIS_CACHE_MODE", "on")
+KOPIS_CACHE_PATH = os.getenv("KOPIS_CACHE_PATH", "./kopis_cache.db")
+KOPIS_CACHE_TTL_LIST = int(os.getenv("KOPIS_CACHE_TTL_LIST", str(12 * 60 * 60)))
+KOPIS_CACHE_TTL_DETAIL = int(os.getenv("KOPIS_CACHE_TTL_DETAIL", str(7 * 24 * 60 * 60)))
+KOPIS_CACHE_PURGE_INTERVAL = int(os.getenv("KOPIS_CACHE_PURGE_INTERVAL", str(60 * 60)))  # on 모드에서 만료된 응답을 지우는 주기(초)
+
+# 백그라운드 동기화 스케줄러 (scheduler.py), 주기는 초 단위이며 0이면 해당 작업을 사용하지 않음
+SYNC_ENABLED = os.getenv("SYNC_ENABLED", "true").lower() in ("1", "true", "yes")
+SYNC_POLL_INTERVAL = int(os.getenv("SYNC_POLL_INTERVAL", "60"))
+SYNC_LISTINGS_INTERVAL = int(os.getenv("SYNC_LISTINGS_INTERVAL", str(24 * 60 * 60)))
+SYNC_UPCOMING_INTERVAL = int(os.getenv("SYNC_UPCOMING_INTERVAL", str(24 * 60 * 60)))
+SYNC_UPCOMING_DAYS = int(os.getenv("SYNC_UPCOMING_DAYS", "30"))
+SYNC_FACILITIES_INTERVAL = int(os.getenv("SYNC_FACILITIES_INTERVAL", "0"))
+SYNC_LOCK_PATH = os.getenv("SYNC_LOCK_PATH", "./kopis_sync.lock")
+
+# KOPIS 요청 속도 제한 (rate_limit.py), 초당 요청 수가 0이면 제한하지 않음
+# 상태 파일을 비워 두면 프로세스별로만 제한함
+KOPIS_RATE_LIMIT = float(os.getenv("KOPIS_RATE_LIMIT", "10"))
+KOPIS_RATE_BURST = int(os.getenv("KOPIS_RATE_BURST", "20"))
+KOPIS_RATE_LIMIT_PATH = os.getenv("KOPIS_RATE_LIMIT_PATH", "./kopis_rate_limit.db")
+KOPIS_RATE_MAX_WAIT = float(os.getenv("KOPIS_RATE_MAX_WAIT", "60"))
+
+# 상세정보 백필 작업 (backfill.py)
+BACKFILL_MAX_ATTEMPTS = int(os.getenv("BACKFILL_MAX_ATTEMPTS", "5"))
+BACKFILL_RETRY_BASE = int(os.getenv("BACKFILL_RETRY_BASE", "60"))
+BACKFILL_RETRY_MAX = int(os.getenv("BACKFILL_RETRY_MAX", str(60 * 60)))
+
+# 기간 목록 조회를 나눌 단위(일)
+KOPIS_SHARD_DAYS = int(os.getenv("KOPIS_SHARD_DAYS", "7"))
+
+# 메모리 인덱스/캐시가 동기화 세대(sync_generation)를 확인하는 주기(초)
+SYNC_GENERATION_CHECK_INTERVAL = float(os.getenv("SYNC_GENERATION_CHECK_INTERVAL", "5"))
+
+# 목록 API 전체 개수 캐시에 보관할 필터 조합 수
+COUNT_CACHE_SIZE = int(os.getenv("COUNT_CACHE_SIZE", "1024"))
+
+# /recommended-shows에서 장르별로 추천할 공연 수
+RECOMMENDED_SHOWS_PER_GENRE = int(os.getenv("RECOMMENDED_SHOWS_PER_GENRE", "10"))
+
+# 데이터베이스 (database.py)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./kopis_performances.db")
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "60"))  # 연결을 기다리는 최대 시간(초)
+# async 엔드포인트의 DB 작업을 실행할 스레드 수 (읽기 연결 풀 최대 크기와 같게 두면 연결을 기다리지 않음)
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_READ_POOL_SIZE * 2)))
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "30000"))  # 잠금 대기(ms)
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", str(64 * 1024)))  # 연결당 페이지 캐시(KiB)
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes, 0이면 사용 안 함
@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import COUNT_CACHE_SIZE, SYNC_GENERATION_CHECK_INTERVAL
+from utils import GenerationWatcher
+
+
+def normalize_filters(name: str, filters: dict) -> Tuple:
+    """
+    값이 없는(None, 빈 문자열) 필터만 빼고 나머지는 쿼리에 쓰는 값 그대로 키로 만듭니다.
+    (공백 등을 정리하면 서로 다른 쿼리가 같은 키를 쓰게 되므로 값은 바꾸지 않음)
+    """
+    items = []
+    for key, value in sorted(filters.items()):
+        if value is None or value == "":
+            continue
+        items.append((key, value.isoformat() if isinstance(value, date) else value))
+    return (name, tuple(items))
+
+class CountCache:
+    """
+    목록 API의 전체 개수 캐시.
+    데이터는 동기화할 때만 바뀌므로 동기화 세대가 바뀌기 전까지는 같은 필터의 count()를 다시 하지 않습니다.
+    """
+
+    def __init__(self, max_entries: int = COUNT_CACHE_SIZE, check_interval: float = SYNC_GENERATION_CHECK_INTERVAL):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.watcher = GenerationWatcher(check_interval)
+        self._lock = threading.Lock()
+        self._counts: "OrderedDict[Tuple, int]" = OrderedDict()
+
+    def _check_generation(self, db: Session) -> Optional[str]:
+        generation = self.watcher.poll(db)
+        if generation is not None:
+            with self._lock:
+                self._counts.clear()
+                self.watcher.mark(generation)
+        return self.watcher.generation
+
+    def count(self, db: Session, name: str, filters: dict, query) -> int:
+        """name과 filters가 같은 이전 결과가 있으면 그대로, 없으면 query.count()를 저장하고 반환합니다."""
+        generation = self._check_generation(db)
+        key = normalize_filters(name, filters)
+        with self._lock:
+            if key in self._counts:
+                self._counts.move_to_end(key)
+                self.hits += 1
+                return self._counts[key]
+            self.misses += 1
+
+        total = query.order_by(None).count()
+
+        with self._lock:
+            # 세는 동안 세대가 바뀌었으면 이전 데이터 기준일 수 있으므로 저장하지 않음
+            if generation == self.watcher.generation:
+                self._counts[key] = total
+                while len(self._counts) > self.max_entries:
+                    self._counts.popitem(last=False)
+        return total
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+            self.watcher.reset()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._counts), "generation": self.watcher.generation, "hits": self.hits, "misses": self.misses}
+
+count_cache = CountCache()
@@ -1,15 +1,96 @@
-from sqlalchemy import create_engine
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./kopis_performances.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+from config import (
+    DATABASE_URL,
+    DB_EXECUTOR_WORKERS,
+    DB_POOL_TIMEOUT,
+    DB_READ_POOL_SIZE,
+    SQLITE_BUSY_TIMEOUT,
+    SQLITE_CACHE_SIZE,
+    SQLITE_MMAP_SIZE,
+)
+
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
+
+T = TypeVar("T")
+
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL, read_only: bool = False, pool_size: int = 1, max_overflow: int = 0) -> Engine:
+    """
+    SQLite 엔진을 만들고 연결마다 PRAGMA를 설정합니다.
+
+    - WAL: 쓰기 트랜잭션 중에도 읽기 연결은 마지막 커밋 기준으로 계속 조회
+    - synchronous=NORMAL: WAL에서는 커밋마다 fsync 하지 않아도 DB가 깨지지 않음 (전원 장애 시 마지막 커밋만 유실될 수 있음)
+    - busy_timeout: 다른 연결이 잠금을 가지고 있으면 바로 실패하지 않고 기다림
+    - read_only이면 query_only로 실수로 쓰는 것을 막음
+    """
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_size=pool_size, max_overflow=max_overflow, pool_timeout=DB_POOL_TIMEOUT)
+
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT / 1000},
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return engine
+
+# SQLite는 쓰기가 한 번에 하나뿐이므로 쓰기 연결은 하나만 두고 (동기화/사용자 요청 쓰기가 순서대로 대기)
+# 조회는 별도의 읽기 전용 연결 풀에서 처리
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
+read_engine = create_db_engine(SQLALCHEMY_DATABASE_URL, read_only=True, pool_size=DB_READ_POOL_SIZE, max_overflow=DB_READ_POOL_SIZE)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
 def get_db():
+    """조회용 세션 (읽기 전용 연결)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_write_db():
+    """DB에 쓰는 엔드포인트용 세션 (쓰기 연결)"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# async 엔드포인트에서 Session을 직접 쓰면 쿼리가 끝날 때까지 이벤트 루프가 멈추므로
+# DB 작업은 전용 스레드 풀에서 실행 (KOPIS 요청 등 다른 블로킹 작업과 스레드를 나눠 쓰지 않도록 분리)
+db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+
+async def run_db(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    func(*args, **kwargs)를 DB 스레드 풀에서 실행하고 결과를 기다립니다.
+    한 요청의 Session은 동시에 한 스레드에서만 쓰이도록 run_db를 순서대로 await 해야 합니다.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
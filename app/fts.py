@@ -0,0 +1,49 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import column, table, text
+
+# migrations.py(0003_fts)에서 만드는 FTS5 가상 테이블 (trigram 토크나이저, 외부 콘텐츠 테이블)
+FTS_TABLES = {
+    "performances_fts": ("performances", ["prfnm", "fcltynm"]),
+    "performance_facilities_fts": ("performance_facilities", ["fcltynm"]),
+}
+
+performances_fts = table("performances_fts", column("rowid"), column("rank"))
+facilities_fts = table("performance_facilities_fts", column("rowid"), column("rank"))
+
+# trigram 토크나이저는 3글자 미만의 검색어를 찾지 못하므로 LIKE로 대체
+MIN_FTS_LENGTH = 3
+
+
+def fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+def split_terms(terms: List[Tuple[str, Optional[str]]]):
+    """(FTS5 MATCH 식, LIKE로 처리할 (컬럼, 검색어) 목록)을 반환합니다."""
+    match = []
+    like = []
+    for column_name, term in terms:
+        if not term:
+            continue
+        if len(term) >= MIN_FTS_LENGTH:
+            match.append(f"{column_name} : {fts_phrase(term)}")
+        else:
+            like.append((column_name, term))
+    return " AND ".join(match), like
+
+def search(query, model, fts_table, terms: List[Tuple[str, Optional[str]]], ranked: bool = True):
+    """
+    terms의 (컬럼, 검색어)로 부분 문자열 검색을 합니다.
+    3글자 이상은 FTS 인덱스로 찾고 관련도(rank) 순으로 정렬하며, 더 짧은 검색어는 LIKE로 찾습니다.
+    """
+    match, like = split_terms(terms)
+    for column_name, term in like:
+        query = query.filter(getattr(model, column_name).like(f"%{term}%"))
+
+    if match:
+        query = query.join(fts_table, fts_table.c.rowid == model.id).filter(
+            text(f"{fts_table.name} MATCH :fts_match").bindparams(fts_match=match)
+        )
+        if ranked:
+            query = query.order_by(fts_table.c.rank)
+    return query
@@ -0,0 +1,46 @@
+from typing import Dict, Optional
+
+GENRE_CODE_MAP = {
+    "AAAA": "연극",
+    "BBBC": "무용(서양/한국무용)",
+    "BBBE": "대중무용",
+    "CCCA": "서양음악(클래식)",
+    "CCCC": "한국음악(국악)",
+    "CCCD": "대중음악",
+    "EEEA": "복합",
+    "EEEB": "서커스/마술",
+    "GGGA": "뮤지컬"
+}
+
+# 이전 KOPIS 장르명 등 GENRE_CODE_MAP과 다르게 들어오는 이름
+GENRE_NAME_ALIASES = {
+    "AAAA": ["연극"],
+    "BBBC": ["무용", "서양/한국무용"],
+    "CCCA": ["클래식", "서양음악"],
+    "CCCC": ["국악", "한국음악"],
+    "EEEB": ["서커스", "마술"],
+}
+
+def normalize_genre_name(name: Optional[str]) -> str:
+    return "".join((name or "").split())
+
+def _build_genre_lookup() -> Dict[str, str]:
+    lookup = {}
+    for code, name in GENRE_CODE_MAP.items():
+        for alias in [name, *GENRE_NAME_ALIASES.get(code, [])]:
+            lookup[normalize_genre_name(alias)] = code
+    return lookup
+
+# 정규화한 장르명 -> 장르 코드
+GENRE_NAME_TO_CODE = _build_genre_lookup()
+
+def genre_code_of(name: Optional[str]) -> Optional[str]:
+    """장르명(표기 차이 허용)의 장르 코드. 모르는 이름이면 None"""
+    return GENRE_NAME_TO_CODE.get(normalize_genre_name(name))
+
+def resolve_genre(value: Optional[str]) -> Optional[str]:
+    """장르코드("GGGA") 또는 장르명("뮤지컬")을 장르 코드로 바꿉니다."""
+    value = (value or "").strip()
+    if value.upper() in GENRE_CODE_MAP:
+        return value.upper()
+    return genre_code_of(value)
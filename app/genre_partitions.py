@@ -0,0 +1,119 @@
+import random
+import threading
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from config import SYNC_GENERATION_CHECK_INTERVAL
+from database import ReadSessionLocal
+from models import PerformanceDB
+from utils import GenerationWatcher, get_sync_generation
+
+# 목록을 다시 만드는 전용 스레드 (요청을 처리하는 db_executor 스레드를 잡지 않도록 분리)
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="genre-partitions")
+
+
+class GenrePartition(NamedTuple):
+    starts: List[date]  # 공연시작일 (오름차순)
+    ids: List[int]      # starts와 같은 순서의 PerformanceDB.id
+
+def partition_query(db: Session, today: date):
+    """장르 코드가 있고 오늘 이후 끝나는 공연. (genre_code, prfpdfrom, prfpdto) 인덱스만으로 처리됨"""
+    return db.query(PerformanceDB.genre_code, PerformanceDB.prfpdfrom, PerformanceDB.id).filter(
+        PerformanceDB.genre_code.isnot(None),
+        PerformanceDB.prfpdto >= today
+    ).order_by(PerformanceDB.genre_code, PerformanceDB.prfpdfrom, PerformanceDB.id)
+
+class GenrePartitions:
+    """
+    장르별로 진행 중이거나 예정인 공연 id를 공연시작일 순으로 미리 나눠 둔 목록.
+    동기화 세대나 날짜가 바뀌면 다시 만들고, 그 사이에는 DB 조회 없이 장르별 공연을 찾습니다.
+    """
+
+    def __init__(self, check_interval: float = SYNC_GENERATION_CHECK_INTERVAL):
+        self.watcher = GenerationWatcher(check_interval)
+        self.loaded_for: Optional[date] = None
+        self._pending_lock = threading.Lock()
+        self._pending: Optional[Future] = None
+        self._partitions: Dict[str, GenrePartition] = {}
+
+    @property
+    def ready(self) -> bool:
+        """처음 만들기가 끝났는지 여부"""
+        return self.loaded_for is not None
+
+    def refresh(self, db: Session, generation: Optional[str] = None):
+        today = date.today()
+        partitions: Dict[str, GenrePartition] = {}
+        for genre_code, prfpdfrom, id in partition_query(db, today).yield_per(5000):
+            partition = partitions.get(genre_code)
+            if partition is None:
+                partition = partitions[genre_code] = GenrePartition([], [])
+            partition.starts.append(prfpdfrom)
+            partition.ids.append(id)
+        # 조회 중인 요청은 이전 목록을 그대로 쓰도록 통째로 교체
+        self._partitions = partitions
+        self.loaded_for = today
+        self.watcher.mark(generation)
+
+    def _refresh_with_new_session(self):
+        db = ReadSessionLocal()
+        try:
+            # 세대를 먼저 읽으므로, 그 뒤에 바뀐 데이터는 다음 확인 때 다시 반영됨
+            self.refresh(db, get_sync_generation(db))
+        finally:
+            db.close()
+
+    def refresh_in_background(self) -> Future:
+        """목록 다시 만들기를 전용 스레드에 맡깁니다. 이미 만드는 중이면 진행 중인 작업을 반환합니다."""
+        with self._pending_lock:
+            if self._pending is None or self._pending.done():
+                self._pending = _refresh_executor.submit(self._refresh_with_new_session)
+            return self._pending
+
+    def ensure_fresh(self, db: Session) -> Optional[Future]:
+        """
+        check_interval초마다 동기화 세대를 확인하고, 세대나 날짜가 바뀌었으면 백그라운드에서 다시 만듭니다.
+        만드는 동안에는 기존 목록으로 응답하며, 만드는 중이면 그 작업(Future)을 반환합니다.
+        """
+        if self.watcher.poll(db) is not None or self.loaded_for != date.today():
+            return self.refresh_in_background()
+        with self._pending_lock:
+            if self._pending is not None and not self._pending.done():
+                return self._pending
+        return None
+
+    def partition(self, genre_code: str) -> GenrePartition:
+        return self._partitions.get(genre_code) or GenrePartition([], [])
+
+    def running(self, genre_code: str, day: Optional[date] = None) -> List[int]:
+        """day(기본 오늘)에 진행 중인 공연 id (공연시작일 순)"""
+        partition = self.partition(genre_code)
+        return partition.ids[:bisect_right(partition.starts, day or date.today())]
+
+    def upcoming(self, genre_code: str, day: Optional[date] = None) -> List[int]:
+        """day(기본 오늘) 이후 시작하는 공연 id (공연시작일 순)"""
+        partition = self.partition(genre_code)
+        return partition.ids[bisect_right(partition.starts, day or date.today()):]
+
+    def sample_upcoming(self, genre_code: str, k: int, day: Optional[date] = None, rng: random.Random = random) -> List[int]:
+        """
+        day(기본 오늘) 이후 시작하는(당일 포함) 공연 중 k개를 무작위로 고릅니다.
+        목록을 복사하지 않고 위치만 뽑으므로 장르의 공연 수와 관계없이 O(k)
+        """
+        partition = self.partition(genre_code)
+        start = bisect_left(partition.starts, day or date.today())
+        positions = range(start, len(partition.ids))
+        return [partition.ids[position] for position in rng.sample(positions, min(k, len(positions)))]
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.watcher.generation,
+            "loaded_for": self.loaded_for.isoformat() if self.loaded_for else None,
+            "genres": {code: len(partition.ids) for code, partition in self._partitions.items()},
+        }
+
+genre_partitions = GenrePartitions()
@@ -0,0 +1,61 @@
+import math
+from typing import List, Tuple
+
+from sqlalchemy import and_, column, or_, table
+
+# migrations.py(0004_facilities_rtree)에서 만드는 R*Tree 가상 테이블 (공연시설 좌표를 점 사각형으로 저장)
+FACILITIES_RTREE = "performance_facilities_rtree"
+facilities_rtree = table(FACILITIES_RTREE, column("id"), column("min_la"), column("max_la"), column("min_lo"), column("max_lo"))
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """중심에서 radius_km 안의 점을 모두 포함하는 (최소 위도, 최대 위도, 최소 경도, 최대 경도). 경도는 ±180을 넘을 수 있음"""
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = max(-90.0, lat - delta_lat), min(90.0, lat + delta_lat)
+    # 극 근처이거나 반경이 너무 크면 경도 범위를 전체로
+    if min_lat <= -90.0 or max_lat >= 90.0 or radius_km >= EARTH_RADIUS_KM * math.cos(math.radians(lat)):
+        return min_lat, max_lat, -180.0, 180.0
+    delta_lon = math.degrees(math.asin(math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat))))
+    return min_lat, max_lat, lon - delta_lon, lon + delta_lon
+
+def bounding_boxes(lat: float, lon: float, radius_km: float) -> List[Tuple[float, float, float, float]]:
+    """bounding_box를 ±180 경도선에서 나눠, 모든 경도가 -180~180 안에 있는 사각형 1~2개로 반환합니다."""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    if min_lon < -180.0:
+        return [(min_lat, max_lat, -180.0, max_lon), (min_lat, max_lat, min_lon + 360.0, 180.0)]
+    if max_lon > 180.0:
+        return [(min_lat, max_lat, min_lon, 180.0), (min_lat, max_lat, -180.0, max_lon - 360.0)]
+    return [(min_lat, max_lat, min_lon, max_lon)]
+
+def within_bounding_box(query, model, lat: float, lon: float, radius_km: float):
+    """R*Tree로 중심에서 radius_km 경계 사각형 안에 좌표가 있는 행만 남깁니다."""
+    boxes = [
+        and_(
+            facilities_rtree.c.max_la >= min_lat,
+            facilities_rtree.c.min_la <= max_lat,
+            facilities_rtree.c.max_lo >= min_lon,
+            facilities_rtree.c.min_lo <= max_lon,
+        )
+        for min_lat, max_lat, min_lon, max_lon in bounding_boxes(lat, lon, radius_km)
+    ]
+    return query.join(facilities_rtree, facilities_rtree.c.id == model.id).filter(or_(*boxes))
+
+def nearby(query, model, lat: float, lon: float, radius_km: float, limit: int) -> List[Tuple[object, float]]:
+    """
+    경계 사각형 안의 시설만 찾은 뒤 실제 거리(하버사인)로 반경 밖을 빼고
+    가까운 순으로 limit개의 (시설, 거리 km)를 반환합니다.
+    """
+    results = []
+    for item in within_bounding_box(query, model, lat, lon, radius_km).all():
+        distance = haversine_km(lat, lon, item.la, item.lo)
+        if distance <= radius_km:
+            results.append((item, distance))
+    results.sort(key=lambda result: (result[1], result[0].id))
+    return results[:limit]
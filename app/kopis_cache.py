@@ -0,0 +1,126 @@
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+from urllib.parse import urlencode
+
+from config import KOPIS_CACHE_MODE, KOPIS_CACHE_PATH, KOPIS_CACHE_PURGE_INTERVAL, KOPIS_CACHE_TTL_DETAIL, KOPIS_CACHE_TTL_LIST
+
+CACHE_MODES = ("off", "on", "record", "replay")
+
+
+class KopisCacheMiss(LookupError):
+    """replay 모드에서 캐시에 없는 요청을 한 경우"""
+
+def cache_key(endpoint: str, params: dict) -> str:
+    # 서비스 키는 제외하고, 파라미터 순서와 무관하게 같은 키가 되도록 정렬
+    items = sorted((k, str(v)) for k, v in params.items() if k != "service" and v is not None)
+    return f"{endpoint}?{urlencode(items)}"
+
+def ttl_for(endpoint: str) -> int:
+    # "pblprfr/PF123456", "prfplc/FC000001" 같은 상세조회는 거의 바뀌지 않음
+    return KOPIS_CACHE_TTL_DETAIL if "/" in endpoint else KOPIS_CACHE_TTL_LIST
+
+class KopisCache:
+    """
+    KOPIS 응답 본문을 SQLite 파일에 저장하는 캐시.
+    replay 모드에서는 TTL을 무시하고 저장된 응답만 사용하므로 네트워크 없이 동기화/벤치마크를 재현할 수 있습니다.
+    """
+
+    def __init__(self, path: str = KOPIS_CACHE_PATH, mode: str = KOPIS_CACHE_MODE):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown KOPIS cache mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._local = threading.local()
+        self._purge_lock = threading.Lock()
+        self._purged_at = float("-inf")
+        if mode != "off":
+            self._connect().execute(
+                "CREATE TABLE IF NOT EXISTS kopis_responses ("
+                " key TEXT PRIMARY KEY,"
+                " endpoint TEXT NOT NULL,"
+                " body BLOB NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # 스레드마다 별도 커넥션 사용 (fetch_many 워커 스레드)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, endpoint: str, params: dict) -> Optional[bytes]:
+        if self.mode in ("off", "record"):
+            return None
+
+        row = self._connect().execute(
+            "SELECT body, fetched_at FROM kopis_responses WHERE key = ?",
+            (cache_key(endpoint, params),)
+        ).fetchone()
+
+        if row is None:
+            if self.mode == "replay":
+                raise KopisCacheMiss(cache_key(endpoint, params))
+            return None
+
+        body, fetched_at = row
+        if self.mode == "on" and time.time() - fetched_at > ttl_for(endpoint):
+            return None
+        return zlib.decompress(body)
+
+    def put(self, endpoint: str, params: dict, body: bytes):
+        if self.mode in ("off", "replay"):
+            return
+
+        self._connect().execute(
+            "INSERT OR REPLACE INTO kopis_responses (key, endpoint, body, fetched_at) VALUES (?, ?, ?, ?)",
+            (cache_key(endpoint, params), endpoint, zlib.compress(body), time.time())
+        )
+
+    def purge_expired(self) -> int:
+        """
+        TTL이 지난 응답을 삭제합니다.
+        record 모드로 저장한 응답은 replay에 쓰이므로 on 모드에서만 삭제합니다.
+        """
+        if self.mode != "on":
+            return 0
+
+        now = time.time()
+        conn = self._connect()
+        deleted = conn.execute(
+            "DELETE FROM kopis_responses WHERE instr(endpoint, '/') > 0 AND fetched_at < ?",
+            (now - KOPIS_CACHE_TTL_DETAIL,)
+        ).rowcount
+        deleted += conn.execute(
+            "DELETE FROM kopis_responses WHERE instr(endpoint, '/') = 0 AND fetched_at < ?",
+            (now - KOPIS_CACHE_TTL_LIST,)
+        ).rowcount
+        return deleted
+
+    def purge_if_due(self, interval: float = KOPIS_CACHE_PURGE_INTERVAL) -> int:
+        """마지막 삭제 후 interval초가 지났으면 purge_expired()를 실행합니다."""
+        now = time.monotonic()
+        with self._purge_lock:
+            if now - self._purged_at < interval:
+                return 0
+            self._purged_at = now
+        return self.purge_expired()
+
+_cache: Optional[KopisCache] = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> KopisCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = KopisCache()
+    # 캐시가 계속 커지지 않도록 주기적으로 만료된 응답 삭제
+    _cache.purge_if_due()
+    return _cache
@@ -0,0 +1,85 @@
+import random
+import threading
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    KOPIS_API_KEY,
+    KOPIS_API_ROOT,
+    KOPIS_BACKOFF_BASE,
+    KOPIS_BACKOFF_MAX,
+    KOPIS_CONNECT_TIMEOUT,
+    KOPIS_MAX_RETRIES,
+    KOPIS_POOL_SIZE,
+    KOPIS_READ_TIMEOUT,
+)
+from kopis_cache import get_cache
+from rate_limit import kopis_bucket
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """모든 KOPIS 요청이 공유하는 keep-alive 세션 (커넥션 풀)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # 재시도는 kopis_get에서 직접 처리
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=KOPIS_POOL_SIZE, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+def close_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def backoff_delay(attempt: int) -> float:
+    # full jitter: 0 ~ min(max, base * 2^attempt)
+    return random.uniform(0, min(KOPIS_BACKOFF_MAX, KOPIS_BACKOFF_BASE * (2 ** attempt)))
+
+def kopis_get(endpoint: str, params: Optional[dict] = None, refresh: bool = False) -> bytes:
+    """
+    KOPIS API를 호출하고 응답 본문(bytes)을 반환합니다.
+
+    endpoint는 KOPIS_API_ROOT 기준 경로입니다. (예: "pblprfr", "pblprfr/PF123456", "prfplc")
+    서비스 키는 자동으로 추가되며, 5xx 응답/타임아웃/연결 오류는 지수 백오프로 재시도합니다.
+    응답은 kopis_cache에 저장되어 TTL 동안 재사용되고, 실제 요청은 rate_limit.kopis_bucket의 예산 안에서만 나갑니다.
+    refresh가 True이면 저장된 응답을 쓰지 않고 다시 요청한 뒤 새 응답을 저장합니다. (replay 모드는 그대로 캐시만 사용)
+    """
+    params = params or {}
+    cache = get_cache()
+    body = None if refresh and cache.mode != "replay" else cache.get(endpoint, params)
+    if body is None:
+        body = _request(endpoint, params)
+        cache.put(endpoint, params, body)
+    return body
+
+def _request(endpoint: str, params: dict) -> bytes:
+    url = f"{KOPIS_API_ROOT}/{endpoint}"
+    params = {"service": KOPIS_API_KEY, **params}
+    session = get_session()
+
+    for attempt in range(KOPIS_MAX_RETRIES + 1):
+        # 재시도도 요청 예산을 사용함
+        kopis_bucket.acquire()
+        try:
+            response = session.get(url, params=params, timeout=(KOPIS_CONNECT_TIMEOUT, KOPIS_READ_TIMEOUT))
+        except (requests.Timeout, requests.ConnectionError):
+            if attempt == KOPIS_MAX_RETRIES:
+                raise
+        else:
+            if response.status_code < 500 or attempt == KOPIS_MAX_RETRIES:
+                response.raise_for_status()
+                return response.content
+        time.sleep(backoff_delay(attempt))
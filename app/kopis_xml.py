@@ -0,0 +1,62 @@
+import io
+import xml.etree.ElementTree as ET
+from typing import Iterator, Optional, Union
+
+
+def _text(elem: ET.Element) -> Optional[str]:
+    # xmltodict과 동일하게 앞뒤 공백을 제거하고, 빈 요소는 None으로 취급
+    if elem.text is None:
+        return None
+    text = elem.text.strip()
+    return text or None
+
+def _value(elem: ET.Element):
+    if len(elem) == 0:
+        return _text(elem)
+    return {child.tag: _value(child) for child in elem}
+
+def iter_kopis_records(source: Union[bytes, str, io.IOBase], record_tag: str = "db") -> Iterator[dict]:
+    """
+    KOPIS XML 응답을 iterparse로 읽으면서 <db> 단위의 평평한 dict를 하나씩 반환합니다.
+
+    - 자식이 없는 요소는 문자열(빈 요소는 None)
+    - <styurls>, <relates>처럼 자식을 가진 요소는 자식 값의 리스트
+      (예: styurls -> ["url", ...], relates -> [{"relatenm": ..., "relateurl": ...}, ...])
+
+    처리한 요소는 바로 clear 하므로 응답 크기와 관계없이 메모리 사용량이 일정합니다.
+    """
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    root = None
+    depth = 0
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+
+        depth -= 1
+        # <dbs> 바로 아래의 <db>만 레코드로 취급
+        if depth != 1 or elem.tag != record_tag:
+            continue
+
+        record = {}
+        for child in elem:
+            if len(child) == 0:
+                record[child.tag] = _text(child)
+            else:
+                record[child.tag] = [_value(item) for item in child]
+        yield record
+
+        elem.clear()
+        root.clear()
+
+def parse_kopis_record(source: Union[bytes, str, io.IOBase]) -> dict:
+    """상세조회 응답처럼 레코드가 하나인 응답을 파싱합니다."""
+    for record in iter_kopis_records(source):
+        return record
+    raise ValueError("KOPIS response contains no <db> record")
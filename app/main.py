@@ -2,15 +2,20 @@ from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import PlainTextResponse
-from datetime import datetime, timedelta
 import json
 
 from fastapi.templating import Jinja2Templates
-from requests import Session
-from models import UpcomingPerformanceDB
-from utils import fetch_from_kopis, update_database, update_upcoming_performances
-from api import performances, facilities, userpick
-from database import Base, SessionLocal, engine, get_db
+from sqlalchemy.orm import Session
+from utils import clear_upcoming_performances
+from kopis_client import close_session
+from api import performances, facilities, userpick, sync
+from config import SYNC_ENABLED
+from scheduler import scheduler, sync_lock
+from database import Base, engine, get_write_db, run_db
+from autocomplete import autocomplete_index
+from genre_partitions import genre_partitions
+from migrations import create_tables, run_migrations
+from pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
 from fastapi.middleware.cors import CORSMiddleware
 
 load_dotenv()
@@ -23,28 +28,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], 
     allow_headers=["*"], 
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 
-Base.metadata.create_all(bind=engine)
+create_tables(engine, Base.metadata)
+run_migrations(engine)
 
 app.include_router(performances.router)
 app.include_router(facilities.router)
 app.include_router(userpick.router)
+app.include_router(sync.router)
 # app.include_router(image.router)
 
 templates = Jinja2Templates(directory="templates")
 
 @app.delete("/upcoming-performances/drop", response_model=str)
-async def drop_upcoming_performance_table(db: Session = Depends(get_db)):
+async def drop_upcoming_performance_table(db: Session = Depends(get_write_db)):
     """
     Delete the entire upcoming_performances table.
     """
     try:
-        # 테이블 삭제
-        UpcomingPerformanceDB.__table__.drop(engine)
-        return "upcoming_performances table has been dropped."
+        # 빈 테이블로 교체 (조회 중인 요청은 기존 테이블을 그대로 사용)
+        dropped = await run_db(drop_upcoming_performances, db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to drop the table: {str(e)}")
+    if not dropped:
+        raise HTTPException(status_code=409, detail="Sync is in progress. Try again later.")
+    return "upcoming_performances table has been dropped."
+
+def drop_upcoming_performances(db: Session) -> bool:
+    # 공연 예정 갱신 작업이 대기 테이블을 채우는 중에 포인터를 바꾸지 않도록 동기화 잠금을 잡고 실행
+    with sync_lock() as acquired:
+        if not acquired:
+            return False
+        clear_upcoming_performances(db)
+        return True
 
 @app.get("/")
 async def root(request: Request):
@@ -130,25 +148,17 @@ async def get_markdown_docs():
 
 @app.on_event("startup")
 async def startup_event():
-    try:
-        db = SessionLocal()
-        start_date = datetime.now().date()
-        end_date = start_date
-
-        near_future = start_date + timedelta(days=30)
-
-        performances = fetch_from_kopis(start_date, end_date)
-        upcoming_performances = fetch_from_kopis(start_date, near_future)
-
-
-        update_database(db, performances)
-        update_upcoming_performances(db, upcoming_performances)
-        
-        print(f"Database updated at {datetime.now()}")
-    except Exception as e:
-        print(f"Error updating database: {e}")
-    finally:
-        db.close()
+    # 동기화는 백그라운드에서 실행하고, 서버는 기존 DB로 바로 요청을 처리함
+    if SYNC_ENABLED:
+        scheduler.start()
+    # 첫 자동완성/추천 요청이 인덱스 생성을 기다리지 않도록 미리 만들어 둠
+    autocomplete_index.refresh_in_background()
+    genre_partitions.refresh_in_background()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await scheduler.stop()
+    close_session()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,208 @@
+"""
+스키마 마이그레이션. 앱 시작 시 자동으로 적용되며, 운영 중인 SQLite 파일에 직접 적용할 수도 있습니다.
+
+    cd app && python migrations.py [--database-url sqlite:///./kopis_performances.db]
+"""
+import argparse
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterator, List, Tuple
+
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import Connection, Engine
+
+from fts import FTS_TABLES
+from geo import FACILITIES_RTREE
+from genre_codes import genre_code_of
+from region_codes import gugun_code_of, sido_code_of
+from utils import user_key_of
+
+# (이름, 함수) 순서대로 적용되며, 적용된 이름은 schema_migrations 테이블에 기록됨
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = []
+
+
+def migration(name: str):
+    def register(fn: Callable[[Connection], None]):
+        MIGRATIONS.append((name, fn))
+        return fn
+    return register
+
+def column_names(conn: Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))]
+
+def add_column(conn: Connection, table: str, column: str, ddl: str):
+    # create_all로 새로 만든 DB에는 이미 컬럼이 있으므로 없을 때만 추가
+    if column not in column_names(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+@contextmanager
+def immediate_transaction(engine: Engine) -> Iterator[Connection]:
+    """
+    BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡는 트랜잭션.
+    여러 워커가 동시에 시작해도 한 프로세스씩 차례로 실행되므로, 안에서 다시 확인한 상태가 커밋할 때까지 유지됩니다.
+    """
+    with engine.connect() as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        yield conn
+        conn.commit()
+
+def create_tables(engine: Engine, metadata: MetaData):
+    """없는 테이블만 만듭니다. (create_all의 확인과 생성 사이에 다른 워커가 끼어들지 않도록 잠금 안에서 실행)"""
+    with immediate_transaction(engine) as conn:
+        metadata.create_all(bind=conn)
+
+def run_migrations(engine: Engine) -> List[str]:
+    """아직 적용되지 않은 마이그레이션을 순서대로 적용하고, 적용한 이름 목록을 반환합니다."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations (name VARCHAR PRIMARY KEY, applied_at DATETIME NOT NULL)"
+        ))
+        applied = {row[0] for row in conn.execute(text("SELECT name FROM schema_migrations"))}
+
+    newly_applied = []
+    for name, fn in MIGRATIONS:
+        if name in applied:
+            continue
+        with immediate_transaction(engine) as conn:
+            # 다른 워커가 먼저 적용했을 수 있으므로 잠금을 잡은 뒤 다시 확인
+            if conn.execute(text("SELECT 1 FROM schema_migrations WHERE name = :name"), {"name": name}).first():
+                continue
+            fn(conn)
+            conn.execute(
+                text("INSERT OR IGNORE INTO schema_migrations (name, applied_at) VALUES (:name, :applied_at)"),
+                {"name": name, "applied_at": datetime.now()}
+            )
+        newly_applied.append(name)
+    return newly_applied
+
+
+@migration("0001_content_hash")
+def add_content_hash(conn: Connection):
+    add_column(conn, "performances", "content_hash", "VARCHAR")
+    add_column(conn, "performance_facilities", "content_hash", "VARCHAR")
+
+def create_index(conn: Connection, name: str, table: str, columns: List[str], unique: bool = False):
+    # 모델의 인덱스는 이후 마이그레이션에서 추가하는 컬럼을 쓸 수 있으므로
+    # 마이그레이션에는 작성 당시의 인덱스를 그대로 적어 둠
+    conn.execute(text(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+@migration("0002_query_indexes")
+def add_query_indexes(conn: Connection):
+    create_index(conn, "ix_performances_period", "performances", ["prfpdfrom", "prfpdto"])
+    create_index(conn, "ix_performances_genrenm_period", "performances", ["genrenm", "prfpdfrom", "prfpdto"])
+    create_index(conn, "ix_performances_prfstate_period", "performances", ["prfstate", "prfpdfrom", "prfpdto"])
+    create_index(conn, "ix_performance_facilities_region", "performance_facilities", ["sidonm", "gugunnm"])
+    create_index(conn, "ix_performance_facilities_fcltychartr", "performance_facilities", ["fcltychartr"])
+    create_index(conn, "ix_upcoming_performances_prfpdfrom", "upcoming_performances", ["prfpdfrom"])
+    create_index(conn, "ix_upcoming_performances_alt_prfpdfrom", "upcoming_performances_alt", ["prfpdfrom"])
+
+@migration("0003_fts")
+def add_fts_tables(conn: Connection):
+    # 동기화 시 별도 처리 없이 인덱스가 유지되도록 원본 테이블 트리거로 갱신
+    for fts_table, (content_table, columns) in FTS_TABLES.items():
+        names = ", ".join(columns)
+        new_values = ", ".join(f"new.{name}" for name in columns)
+        old_values = ", ".join(f"old.{name}" for name in columns)
+
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+            f"{names}, content='{content_table}', content_rowid='id', tokenize='trigram')"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {content_table} BEGIN "
+            f"INSERT INTO {fts_table}(rowid, {names}) VALUES (new.id, {new_values}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {content_table} BEGIN "
+            f"INSERT INTO {fts_table}({fts_table}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {names} ON {content_table} BEGIN "
+            f"INSERT INTO {fts_table}({fts_table}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts_table}(rowid, {names}) VALUES (new.id, {new_values}); END"
+        ))
+        conn.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+
+@migration("0004_facilities_rtree")
+def add_facilities_rtree(conn: Connection):
+    # 좌표가 있는 시설만 (id, la, la, lo, lo) 점으로 저장하고, FTS와 마찬가지로 트리거로 갱신
+    conn.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {FACILITIES_RTREE} USING rtree(id, min_la, max_la, min_lo, max_lo)"))
+    has_point = "new.la IS NOT NULL AND new.lo IS NOT NULL"
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {FACILITIES_RTREE}_ai AFTER INSERT ON performance_facilities WHEN {has_point} BEGIN "
+        f"INSERT INTO {FACILITIES_RTREE} VALUES (new.id, new.la, new.la, new.lo, new.lo); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {FACILITIES_RTREE}_ad AFTER DELETE ON performance_facilities BEGIN "
+        f"DELETE FROM {FACILITIES_RTREE} WHERE id = old.id; END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {FACILITIES_RTREE}_au AFTER UPDATE OF la, lo ON performance_facilities BEGIN "
+        f"DELETE FROM {FACILITIES_RTREE} WHERE id = old.id; "
+        f"INSERT INTO {FACILITIES_RTREE} SELECT new.id, new.la, new.la, new.lo, new.lo WHERE {has_point}; END"
+    ))
+    conn.execute(text(
+        f"INSERT OR REPLACE INTO {FACILITIES_RTREE} "
+        f"SELECT id, la, la, lo, lo FROM performance_facilities WHERE la IS NOT NULL AND lo IS NOT NULL"
+    ))
+
+@migration("0005_region_codes")
+def add_region_codes(conn: Connection):
+    add_column(conn, "performances", "sido_code", "INTEGER")
+    add_column(conn, "performance_facilities", "sido_code", "INTEGER")
+    add_column(conn, "performance_facilities", "gugun_code", "INTEGER")
+    conn.execute(text("DROP INDEX IF EXISTS ix_performance_facilities_region"))
+    create_index(conn, "ix_performances_sido_period", "performances", ["sido_code", "prfpdfrom", "prfpdto"])
+    create_index(conn, "ix_performance_facilities_region_code", "performance_facilities", ["sido_code", "gugun_code"])
+
+    # 지역명 종류는 많지 않으므로 이름 조합별로 한 번씩 변환해서 갱신
+    for (area,) in conn.execute(text("SELECT DISTINCT area FROM performances")).all():
+        conn.execute(
+            text("UPDATE performances SET sido_code = :sido_code WHERE area IS :area"),
+            {"sido_code": sido_code_of(area), "area": area}
+        )
+    for sidonm, gugunnm in conn.execute(text("SELECT DISTINCT sidonm, gugunnm FROM performance_facilities")).all():
+        sido_code = sido_code_of(sidonm)
+        conn.execute(
+            text("UPDATE performance_facilities SET sido_code = :sido_code, gugun_code = :gugun_code "
+                 "WHERE sidonm IS :sidonm AND gugunnm IS :gugunnm"),
+            {"sido_code": sido_code, "gugun_code": gugun_code_of(sido_code, gugunnm), "sidonm": sidonm, "gugunnm": gugunnm}
+        )
+
+@migration("0006_genre_code")
+def add_genre_code(conn: Connection):
+    add_column(conn, "performances", "genre_code", "VARCHAR(4)")
+    conn.execute(text("DROP INDEX IF EXISTS ix_performances_genrenm_period"))
+    create_index(conn, "ix_performances_genre_period", "performances", ["genre_code", "prfpdfrom", "prfpdto"])
+
+    for (genrenm,) in conn.execute(text("SELECT DISTINCT genrenm FROM performances")).all():
+        conn.execute(
+            text("UPDATE performances SET genre_code = :genre_code WHERE genrenm IS :genrenm"),
+            {"genre_code": genre_code_of(genrenm), "genrenm": genrenm}
+        )
+
+@migration("0007_user_pick_key")
+def add_user_pick_key(conn: Connection):
+    add_column(conn, "user_picks", "user_key", "BIGINT")
+    for (token,) in conn.execute(text("SELECT DISTINCT token FROM user_picks WHERE user_key IS NULL AND token IS NOT NULL")).all():
+        conn.execute(text("UPDATE user_picks SET user_key = :user_key WHERE token = :token"), {"user_key": user_key_of(token), "token": token})
+    # 같은 사용자의 중복 Pick은 먼저 저장된 것만 남기고 유니크 인덱스 생성
+    conn.execute(text(
+        "DELETE FROM user_picks WHERE id NOT IN (SELECT MIN(id) FROM user_picks GROUP BY user_key, performance_id)"
+    ))
+    create_index(conn, "ix_user_picks_user_key_performance_id", "user_picks", ["user_key", "performance_id"], unique=True)
+
+def main():
+    from database import Base, SQLALCHEMY_DATABASE_URL, create_db_engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=SQLALCHEMY_DATABASE_URL)
+    args = parser.parse_args()
+
+    engine = create_db_engine(args.database_url)
+    create_tables(engine, Base.metadata)
+    applied = run_migrations(engine)
+    print(f"Applied: {', '.join(applied)}" if applied else "Already up to date")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Date, Text, Float
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, Integer, String, Date, DateTime, Text, Float
 from database import Base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import declared_attr, relationship
 
 class PerformanceDB(Base):
     __tablename__ = "performances"
@@ -13,10 +13,22 @@ class PerformanceDB(Base):
     fcltynm = Column(String)
     poster = Column(String)
     genrenm = Column(String)
+    genre_code = Column(String(4))  # genrenm으로 찾은 장르 코드 (genre_codes.GENRE_CODE_MAP)
     prfstate = Column(String)
     openrun = Column(String)
     area = Column(String)
+    sido_code = Column(Integer)  # area로 찾은 시도 코드 (region_codes.SIDO_CODE_MAP)
     last_updated = Column(Date)
+    content_hash = Column(String)  # 목록 API 응답 원본의 해시 (변경 감지용)
+
+    # /performances, /auto-fill의 기간 겹침 조건(prfpdfrom <= 종료일 AND prfpdto >= 시작일)과
+    # 함께 쓰이는 동등 조건별 복합 인덱스
+    __table_args__ = (
+        Index("ix_performances_period", "prfpdfrom", "prfpdto"),
+        Index("ix_performances_genre_period", "genre_code", "prfpdfrom", "prfpdto"),
+        Index("ix_performances_prfstate_period", "prfstate", "prfpdfrom", "prfpdto"),
+        Index("ix_performances_sido_period", "sido_code", "prfpdfrom", "prfpdto"),
+    )
 
 class PerformanceDetailDB(Base):
     __tablename__ = "performance_details"
@@ -53,6 +65,8 @@ class PerformanceFacilityDB(Base):
     fcltychartr = Column(String)
     sidonm = Column(String)
     gugunnm = Column(String)
+    sido_code = Column(Integer)  # sidonm, gugunnm으로 찾은 지역 코드 (region_codes)
+    gugun_code = Column(Integer)
     opende = Column(String)
     seatscale = Column(Integer)
     telno = Column(String)
@@ -60,17 +74,29 @@ class PerformanceFacilityDB(Base):
     adres = Column(String)
     la = Column(Float)
     lo = Column(Float)
+    content_hash = Column(String)  # 목록 API 응답 원본의 해시 (변경 감지용)
+
+    __table_args__ = (
+        Index("ix_performance_facilities_region_code", "sido_code", "gugun_code"),
+        Index("ix_performance_facilities_fcltychartr", "fcltychartr"),
+    )
 
 # 삭제 보류
 class UserPick(Base):
     __tablename__ = "user_picks"
 
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String, index=True)  # 사용자 토큰
+    token = Column(String, index=True)  # 사용자 토큰 (이전 데이터, 지금은 user_key만 기록)
+    user_key = Column(BigInteger)  # utils.user_key_of(토큰)
     performance_id = Column(String, ForeignKey("performances.mt20id"))
 
     performance = relationship("PerformanceDB", back_populates="picks")
 
+    # 사용자별 조회/변경분 삭제가 인덱스만으로 처리되고, 같은 Pick이 두 번 저장되지 않도록 함
+    __table_args__ = (
+        Index("ix_user_picks_user_key_performance_id", "user_key", "performance_id", unique=True),
+    )
+
 # PerformanceDB 모델에 관계 추가
 PerformanceDB.picks = relationship("UserPick", back_populates="performance")
 
@@ -87,9 +113,7 @@ class UserGenre(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     genre = Column(String)
 
-class UpcomingPerformanceDB(Base):
-    __tablename__ = "upcoming_performances"
-
+class UpcomingPerformanceMixin:
     mt20id = Column(String, primary_key=True, index=True)
     prfnm = Column(String, index=True)
     prfpdfrom = Column(Date)
@@ -99,4 +123,50 @@ class UpcomingPerformanceDB(Base):
     area = Column(String, nullable=True, default="Unknown")  # 필드 추가
     genrenm = Column(String, nullable=True, default="Unknown")
     openrun = Column(String, nullable=True, default="N/A")
-    prfstate = Column(String)
\ No newline at end of file
+    prfstate = Column(String)
+
+    @declared_attr
+    def __table_args__(cls):
+        return (Index(f"ix_{cls.__tablename__}_prfpdfrom", "prfpdfrom"),)
+
+# 공연 예정 목록은 두 테이블을 번갈아 사용함
+# 한쪽을 채운 뒤 sync_state의 포인터만 바꾸므로, 조회 중인 테이블은 갱신 중에도 그대로 유지됨
+class UpcomingPerformanceDB(UpcomingPerformanceMixin, Base):
+    __tablename__ = "upcoming_performances"
+
+class UpcomingPerformanceAltDB(UpcomingPerformanceMixin, Base):
+    __tablename__ = "upcoming_performances_alt"
+
+UPCOMING_PERFORMANCE_SLOTS = {
+    model.__tablename__: model for model in (UpcomingPerformanceDB, UpcomingPerformanceAltDB)
+}
+
+class SyncState(Base):
+    __tablename__ = "sync_state"
+
+    key = Column(String, primary_key=True)
+    value = Column(String)
+
+class SyncRun(Base):
+    __tablename__ = "sync_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job = Column(String, index=True)
+    status = Column(String)  # running / success / failed
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime, nullable=True)
+    duration = Column(Float, nullable=True)
+    processed = Column(Integer, default=0)
+    written = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+
+class BackfillCheckpoint(Base):
+    __tablename__ = "backfill_checkpoints"
+
+    mt20id = Column(String, primary_key=True)
+    status = Column(String, index=True)  # pending / done / failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime)
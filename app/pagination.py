@@ -0,0 +1,71 @@
+import base64
+import binascii
+import json
+from datetime import date
+from typing import Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+# 목록 응답 형식은 그대로 두고 다음 페이지 커서와 전체 개수는 헤더로 전달
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(values: Sequence) -> str:
+    data = json.dumps([value.isoformat() if isinstance(value, date) else value for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """잘못된 커서는 400 에러"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def cursor_value(column, value):
+    """커서에 담긴 값을 컬럼의 Python 타입으로 확인합니다. (날짜는 ISO 문자열에서 변환) 타입이 다르면 400 에러"""
+    python_type = column.type.python_type
+    if python_type is date and isinstance(value, str):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    # bool은 int의 하위 타입이므로 정확히 같은 타입만 허용
+    elif type(value) is python_type:
+        return value
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def after(columns: Sequence, values: Sequence):
+    """
+    (a, b) > (x, y) 조건. a >= x를 따로 두어 첫 번째 컬럼 인덱스로 범위 검색을 하도록 합니다.
+    """
+    conditions = [
+        and_(*[column == value for column, value in zip(columns[:i], values[:i])], columns[i] > values[i])
+        for i in range(len(columns))
+    ]
+    return and_(columns[0] >= values[0], or_(*conditions))
+
+def keyset_page(query, columns: Sequence, rows: int, cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+    """
+    columns 순서로 정렬하여 cursor 다음부터 rows개를 가져옵니다. (columns는 NULL이 없고 마지막 컬럼이 유일해야 함)
+    다음 페이지가 있으면 그 커서를, 없으면 None을 함께 반환합니다.
+    """
+    if cursor:
+        values = [cursor_value(column, value) for column, value in zip(columns, decode_cursor(cursor, len(columns)))]
+        query = query.filter(after(columns, values))
+
+    items = query.order_by(*columns).limit(rows + 1).all()
+    if len(items) <= rows:
+        return items, None
+    last = items[rows - 1]
+    return items[:rows], encode_cursor([getattr(last, column.key) for column in columns])
+
+def set_page_headers(response: Response, next_cursor: Optional[str] = None, total_count: Optional[int] = None):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if total_count is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total_count)
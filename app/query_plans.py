@@ -0,0 +1,90 @@
+"""
+목록 API 쿼리가 인덱스를 사용하는지 EXPLAIN QUERY PLAN으로 확인합니다.
+
+    cd app && python query_plans.py [--database-url sqlite:///./kopis_performances.db]
+
+하나라도 기대한 인덱스를 쓰지 않으면 종료 코드 1을 반환합니다.
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from api.facilities import filter_facilities
+from api.performances import filter_performances
+from models import PerformanceDB, PerformanceFacilityDB, UpcomingPerformanceDB, UserPick
+from geo import within_bounding_box
+from genre_partitions import partition_query
+from pagination import after
+
+
+class PlanCheck(NamedTuple):
+    name: str
+    build: Callable[[Session], object]  # Query를 반환
+    index: str  # 쿼리 플랜에 나와야 하는 인덱스 이름 (FTS는 가상 테이블 이름)
+
+class PlanResult(NamedTuple):
+    name: str
+    index: str
+    plan: List[str]
+    ok: bool
+
+_today = date.today()
+_month = _today + timedelta(days=30)
+
+def keyset_query(query):
+    """cursor 모드의 두 번째 페이지 이후 쿼리 (pagination.keyset_page와 같은 조건)"""
+    columns = [PerformanceDB.prfpdfrom, PerformanceDB.id]
+    return query.filter(after(columns, [_today, 0])).order_by(*columns).limit(11)
+
+PLAN_CHECKS: List[PlanCheck] = [
+    PlanCheck("/performances 기간", lambda db: filter_performances(db.query(PerformanceDB), _today, _month), "ix_performances_period"),
+    PlanCheck("/performances 장르", lambda db: filter_performances(db.query(PerformanceDB), _today, _month, shcate="GGGA"), "ix_performances_genre_period"),
+    PlanCheck("/performances 공연상태", lambda db: filter_performances(db.query(PerformanceDB), _today, _month, prfstate="공연중"), "ix_performances_prfstate_period"),
+    PlanCheck("/performances 지역", lambda db: filter_performances(db.query(PerformanceDB), _today, _month, signgucode="11"), "ix_performances_sido_period"),
+    PlanCheck("/performances 커서", lambda db: keyset_query(filter_performances(db.query(PerformanceDB), _today, _month, ranked=False)), "ix_performances_period"),
+    PlanCheck("/performances 공연명 검색", lambda db: filter_performances(db.query(PerformanceDB), _today, _month, shprfnm="레미제라블"), "performances_fts"),
+    PlanCheck("/performance-facilities 시설명 검색", lambda db: filter_facilities(db.query(PerformanceFacilityDB), shprfnmfct="예술의전당"), "performance_facilities_fts"),
+    PlanCheck("/performance-facilities 시도", lambda db: filter_facilities(db.query(PerformanceFacilityDB), "11"), "ix_performance_facilities_region_code"),
+    PlanCheck("/performance-facilities 구군", lambda db: filter_facilities(db.query(PerformanceFacilityDB), "11", "1111"), "ix_performance_facilities_region_code"),
+    PlanCheck("/performance-facilities 특성", lambda db: filter_facilities(db.query(PerformanceFacilityDB), fcltychartr="기타(공공)"), "ix_performance_facilities_fcltychartr"),
+    PlanCheck("/performance-facilities/nearby", lambda db: within_bounding_box(db.query(PerformanceFacilityDB), PerformanceFacilityDB, 37.5663, 126.9779, 3), "performance_facilities_rtree"),
+    PlanCheck("장르별 공연 목록 (genre_partitions)", lambda db: partition_query(db, _today), "ix_performances_genre_period"),
+    PlanCheck("/user-picks", lambda db: db.query(UserPick.performance_id).filter(UserPick.user_key == 1), "ix_user_picks_user_key_performance_id"),
+    PlanCheck("/upcoming-performances", lambda db: db.query(UpcomingPerformanceDB).filter(UpcomingPerformanceDB.prfpdfrom > _today).order_by(UpcomingPerformanceDB.prfpdfrom), "ix_upcoming_performances_prfpdfrom"),
+]
+
+
+def explain(db: Session, query) -> List[str]:
+    compiled = query.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    return [row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")]
+
+def check_query_plans(engine: Engine, checks: List[PlanCheck] = PLAN_CHECKS) -> List[PlanResult]:
+    results = []
+    with Session(bind=engine) as db:
+        for check in checks:
+            plan = explain(db, check.build(db))
+            ok = any(f"INDEX {check.index}" in step or f"{check.index} VIRTUAL TABLE" in step for step in plan)
+            results.append(PlanResult(check.name, check.index, plan, ok))
+    return results
+
+def main():
+    from database import SQLALCHEMY_DATABASE_URL, create_db_engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=SQLALCHEMY_DATABASE_URL)
+    args = parser.parse_args()
+
+    engine = create_db_engine(args.database_url)
+    results = check_query_plans(engine)
+    for result in results:
+        print(f"[{'OK' if result.ok else 'FAIL'}] {result.name} (expect {result.index})")
+        for step in result.plan:
+            print(f"    {step}")
+    sys.exit(0 if all(result.ok for result in results) else 1)
+
+if __name__ == "__main__":
+    main()
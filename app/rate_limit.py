@@ -0,0 +1,105 @@
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from config import KOPIS_RATE_BURST, KOPIS_RATE_LIMIT, KOPIS_RATE_LIMIT_PATH, KOPIS_RATE_MAX_WAIT
+
+
+class RateLimitExceeded(Exception):
+    """토큰을 얻기까지 max_wait보다 오래 기다려야 하는 경우"""
+
+class TokenBucket:
+    """
+    초당 rate개, 최대 burst개까지 모이는 토큰 버킷.
+
+    state_path가 있으면 버킷 상태를 SQLite 파일에 두고 BEGIN IMMEDIATE로 갱신하므로
+    같은 파일을 쓰는 모든 워커 프로세스가 하나의 예산을 나눠 씁니다.
+    스레드에서 호출하도록 되어 있으며, 비동기 코드에서는 스레드를 거쳐 호출합니다.
+    """
+
+    def __init__(self, rate: float, burst: int, state_path: Optional[str] = None, max_wait: float = KOPIS_RATE_MAX_WAIT, name: str = "kopis"):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.state_path = state_path
+        self.max_wait = max_wait
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._tokens = float(self.burst)
+        self._updated_at = time.time()
+
+        self.calls = 0
+        self.waited = 0.0
+        self.rejected = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # 상태 파일은 import 시점이 아니라 처음 acquire() 할 때 열고 만듦
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.state_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS token_buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)", (self.name, float(self.burst), time.time()))
+            self._local.conn = conn
+        return conn
+
+    def _take(self, tokens: float, updated_at: float, now: float):
+        # 토큰을 채우고 하나를 가져감. (남은 토큰, 기다려야 할 시간)을 반환
+        tokens = min(float(self.burst), tokens + max(0.0, now - updated_at) * self.rate)
+        if tokens >= 1:
+            return tokens - 1, 0.0
+        return tokens, (1 - tokens) / self.rate
+
+    def _try_acquire(self) -> float:
+        now = time.time()
+        if not self.state_path:
+            self._tokens, wait = self._take(self._tokens, self._updated_at, now)
+            self._updated_at = now
+            return wait
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, updated_at = conn.execute("SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (self.name,)).fetchone()
+            tokens, wait = self._take(tokens, updated_at, now)
+            conn.execute("UPDATE token_buckets SET tokens = ?, updated_at = ? WHERE name = ?", (tokens, now, self.name))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def acquire(self) -> float:
+        """토큰 하나를 얻을 때까지 기다리고, 기다린 시간을 반환합니다."""
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                wait = self._try_acquire()
+                if wait == 0:
+                    self.calls += 1
+                    self.waited += waited
+                    return waited
+                if waited + wait > self.max_wait:
+                    self.rejected += 1
+                    self.waited += waited
+                    raise RateLimitExceeded(f"KOPIS rate limit: would wait more than {self.max_wait}s")
+            time.sleep(wait)
+            waited += wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "shared": bool(self.state_path),
+                "calls": self.calls,
+                "waited_seconds": round(self.waited, 3),
+                "rejected": self.rejected,
+            }
+
+kopis_bucket = TokenBucket(KOPIS_RATE_LIMIT, KOPIS_RATE_BURST, KOPIS_RATE_LIMIT_PATH or None)
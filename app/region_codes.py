@@ -1,3 +1,5 @@
+from typing import Dict, Optional, Tuple
+
 SIDO_CODE_MAP = {
     "11": "서울",
     "26": "부산",
@@ -269,4 +271,78 @@ GUGUN_CODE_MAP = {
 def get_region_name(signgucode: str, signgucodesub: str = None) -> str:
     if signgucodesub:
         return GUGUN_CODE_MAP.get(signgucodesub, "")
-    return SIDO_CODE_MAP.get(signgucode, "")
\ No newline at end of file
+    return SIDO_CODE_MAP.get(signgucode, "")
+
+# KOPIS 응답의 시도명은 "서울", "서울특별시", "충북"처럼 표기가 섞여 있어 코드별 다른 이름을 함께 등록
+SIDO_NAME_ALIASES = {
+    "11": ["서울특별시", "서울시"],
+    "26": ["부산광역시", "부산시"],
+    "27": ["대구광역시", "대구시"],
+    "28": ["인천광역시", "인천시"],
+    "29": ["광주광역시", "광주시"],
+    "30": ["대전광역시", "대전시"],
+    "31": ["울산광역시", "울산시"],
+    "36": ["세종특별자치시", "세종시"],
+    "41": ["경기도"],
+    "51": ["강원도", "강원특별자치도"],
+    "43": ["충북"],
+    "44": ["충남"],
+    "45": ["전북", "전북특별자치도"],
+    "46": ["전남"],
+    "47": ["경북"],
+    "48": ["경남"],
+    "50": ["제주도", "제주특별자치도"],
+}
+
+def normalize_region_name(name: Optional[str]) -> str:
+    return "".join((name or "").split())
+
+def _build_sido_lookup() -> Dict[str, int]:
+    lookup = {}
+    for code, name in SIDO_CODE_MAP.items():
+        for alias in [name, *SIDO_NAME_ALIASES.get(code, [])]:
+            lookup[normalize_region_name(alias)] = int(code)
+    return lookup
+
+# 정규화한 시도명 -> 시도 코드
+SIDO_NAME_TO_CODE = _build_sido_lookup()
+
+def sido_code_of(name: Optional[str]) -> Optional[int]:
+    """시도명(표기 차이 허용)의 시도 코드. 모르는 이름이면 None"""
+    return SIDO_NAME_TO_CODE.get(normalize_region_name(name))
+
+def _build_gugun_lookup() -> Dict[Tuple[int, str], int]:
+    # GUGUN_CODE_MAP의 이름은 "시도 구군" 형식 (시도만 있는 "2600" 등은 제외)
+    lookup = {}
+    for code, name in GUGUN_CODE_MAP.items():
+        sido_name, _, gugun_name = name.partition(" ")
+        if not gugun_name:
+            continue
+        sido_code = sido_code_of(sido_name)
+        if sido_code is not None:
+            lookup[(sido_code, normalize_region_name(gugun_name))] = int(code)
+    return lookup
+
+# (시도 코드, 정규화한 구군명) -> 구군 코드
+GUGUN_NAME_TO_CODE = _build_gugun_lookup()
+
+def gugun_code_of(sido_code: Optional[int], name: Optional[str]) -> Optional[int]:
+    """시도 코드와 구군명의 구군 코드. "수원시 장안구"처럼 구까지 붙어 있으면 시 단위로 찾습니다."""
+    if sido_code is None or not name:
+        return None
+    code = GUGUN_NAME_TO_CODE.get((sido_code, normalize_region_name(name)))
+    if code is None:
+        code = GUGUN_NAME_TO_CODE.get((sido_code, name.split()[0]))
+    return code
+
+def region_codes_of(signgucode: Optional[str], signgucodesub: Optional[str] = None) -> Tuple[Optional[int], Optional[int]]:
+    """
+    요청의 지역(시도)코드, 지역(구군)코드 문자열을 저장된 (sido_code, gugun_code) 값으로 바꿉니다.
+    구군 코드 앞 두 자리가 시도 코드이며, "2600"처럼 시도 전체를 뜻하는 구군 코드는 시도로만 조회합니다.
+    모르는 코드는 get_region_name과 마찬가지로 조건 없이 None
+    """
+    signgucode, signgucodesub = (signgucode or "").strip(), (signgucodesub or "").strip()
+    if signgucodesub in GUGUN_CODE_MAP:
+        gugun_code = int(signgucodesub)
+        return gugun_code // 100, (gugun_code if gugun_code % 100 else None)
+    return (int(signgucode) if signgucode in SIDO_CODE_MAP else None), None
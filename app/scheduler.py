@@ -0,0 +1,192 @@
+import asyncio
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from config import (
+    SYNC_ENABLED,
+    SYNC_FACILITIES_INTERVAL,
+    SYNC_LISTINGS_INTERVAL,
+    SYNC_LOCK_PATH,
+    SYNC_POLL_INTERVAL,
+    SYNC_UPCOMING_DAYS,
+    SYNC_UPCOMING_INTERVAL,
+)
+from database import SessionLocal
+from models import SyncRun
+from utils import (
+    fetch_facilities_from_kopis,
+    fetch_from_kopis,
+    fetch_from_kopis_sharded,
+    update_database,
+    update_facilities_database,
+    update_upcoming_performances,
+)
+
+
+class SyncJob(NamedTuple):
+    name: str
+    interval: int  # 초, 0이면 사용 안 함
+    run: Callable[[Session], Dict[str, int]]
+
+
+def sync_listings(db: Session) -> Dict[str, int]:
+    today = datetime.now().date()
+    result = update_database(db, fetch_from_kopis(today, today))
+    return {"processed": result.processed, "written": result.written, "failed": len(result.failed)}
+
+def sync_upcoming(db: Session) -> Dict[str, int]:
+    today = datetime.now().date()
+    processed = update_upcoming_performances(db, fetch_from_kopis_sharded(today, today + timedelta(days=SYNC_UPCOMING_DAYS)))
+    return {"processed": processed, "written": processed, "failed": 0}
+
+def sync_facilities(db: Session) -> Dict[str, int]:
+    result = update_facilities_database(db, fetch_facilities_from_kopis())
+    return {"processed": result.processed, "written": result.written, "failed": len(result.failed)}
+
+JOBS: List[SyncJob] = [
+    SyncJob("listings", SYNC_LISTINGS_INTERVAL, sync_listings),
+    SyncJob("upcoming", SYNC_UPCOMING_INTERVAL, sync_upcoming),
+    SyncJob("facilities", SYNC_FACILITIES_INTERVAL, sync_facilities),
+]
+
+@contextmanager
+def sync_lock(path: str = SYNC_LOCK_PATH):
+    """
+    여러 uvicorn 워커 중 한 프로세스만 동기화하도록 파일 잠금을 시도합니다.
+    다른 프로세스가 잠금을 가지고 있으면 False를 반환합니다.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+def last_run(db: Session, job: str, status: Optional[str] = None) -> Optional[SyncRun]:
+    query = db.query(SyncRun).filter(SyncRun.job == job)
+    if status:
+        query = query.filter(SyncRun.status == status)
+    return query.order_by(SyncRun.id.desc()).first()
+
+def is_due(db: Session, job: SyncJob, now: datetime) -> bool:
+    if job.interval <= 0:
+        return False
+    # 실패한 작업도 다음 주기까지 기다림 (KOPIS 장애 시 매 폴링마다 재시도하지 않도록)
+    run = last_run(db, job.name)
+    return run is None or run.started_at + timedelta(seconds=job.interval) <= now
+
+def run_job(job: SyncJob) -> SyncRun:
+    db = SessionLocal()
+    try:
+        run = SyncRun(job=job.name, status="running", started_at=datetime.now())
+        db.add(run)
+        db.commit()
+
+        started = time.perf_counter()
+        try:
+            counts = job.run(db)
+            run.status = "success"
+            run.processed = counts.get("processed", 0)
+            run.written = counts.get("written", 0)
+            run.failed = counts.get("failed", 0)
+        except Exception as e:
+            db.rollback()
+            run.status = "failed"
+            run.error = str(e)
+            print(f"Sync job {job.name} failed: {e}")
+
+        run.finished_at = datetime.now()
+        run.duration = time.perf_counter() - started
+        db.commit()
+        db.refresh(run)
+        db.expunge(run)
+        return run
+    finally:
+        db.close()
+
+def run_due_jobs(jobs: List[SyncJob] = JOBS, force: bool = False) -> List[SyncRun]:
+    """잠금을 얻은 경우에만 주기가 된 작업을 순서대로 실행합니다."""
+    with sync_lock() as acquired:
+        if not acquired:
+            return []
+
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            due = [job for job in jobs if job.interval > 0 and (force or is_due(db, job, now))]
+        finally:
+            db.close()
+
+        return [run_job(job) for job in due]
+
+class SyncScheduler:
+    def __init__(self, jobs: List[SyncJob] = JOBS, poll_interval: int = SYNC_POLL_INTERVAL):
+        self.jobs = jobs
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                # 동기화는 블로킹 작업이므로 스레드에서 실행하여 요청 처리를 막지 않음
+                await asyncio.to_thread(run_due_jobs, self.jobs)
+            except Exception as e:
+                print(f"Sync scheduler error: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+scheduler = SyncScheduler()
+
+def job_status(db: Session) -> List[dict]:
+    status = []
+    for job in JOBS:
+        run = last_run(db, job.name)
+        success = last_run(db, job.name, "success")
+        status.append({
+            "job": job.name,
+            "enabled": SYNC_ENABLED and job.interval > 0,
+            "interval": job.interval,
+            "last_run": _run_to_dict(run),
+            "last_success": _run_to_dict(success),
+            "next_run": (run.started_at + timedelta(seconds=job.interval)).isoformat() if run and job.interval > 0 else None,
+        })
+    return status
+
+def _run_to_dict(run: Optional[SyncRun]) -> Optional[dict]:
+    if run is None:
+        return None
+    return {
+        "status": run.status,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+        "duration": run.duration,
+        "processed": run.processed,
+        "written": run.written,
+        "failed": run.failed,
+        "error": run.error,
+    }
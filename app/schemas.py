@@ -66,6 +66,9 @@ class PerformanceFacility(BaseModel):
     la: float
     lo: float
 
+class NearbyPerformanceFacility(PerformanceFacility):
+    distance: float  # km
+
 class PerformanceName(BaseModel):
     prfnm: str
 
@@ -0,0 +1,46 @@
+"""
+R*Tree 반경 검색(geo.nearby) 테스트
+
+    cd app && python -m pytest tests
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from database import Base
+from geo import bounding_boxes, nearby
+from migrations import run_migrations
+from models import PerformanceFacilityDB
+
+# 날짜변경선(±180) 양쪽과 서울의 시설
+FACILITIES = {
+    "FC000001": (-17.7765, 179.9),
+    "FC000002": (-17.7765, -179.9),
+    "FC000003": (37.5663, 126.9779),
+}
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'geo.db'}")
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    with Session(bind=engine) as session:
+        session.add_all(PerformanceFacilityDB(mt10id=mt10id, la=la, lo=lo) for mt10id, (la, lo) in FACILITIES.items())
+        session.commit()
+        yield session
+
+def nearby_ids(db, lat, lon, radius_km):
+    return [facility.mt10id for facility, _ in nearby(db.query(PerformanceFacilityDB), PerformanceFacilityDB, lat, lon, radius_km, 10)]
+
+@pytest.mark.parametrize("lon", [179.95, -179.95, 180.0, -180.0])
+def test_nearby_across_antimeridian(db, lon):
+    assert sorted(nearby_ids(db, -17.7765, lon, 30)) == ["FC000001", "FC000002"]
+
+def test_bounding_boxes_stay_within_longitude_range():
+    for lon in (179.95, -179.95, 180.0, -180.0, 126.9779):
+        for _, _, min_lon, max_lon in bounding_boxes(-17.7765, lon, 30):
+            assert -180.0 <= min_lon <= max_lon <= 180.0
+
+def test_nearby_in_korea(db):
+    assert nearby_ids(db, 37.5663, 126.98, 3) == ["FC000003"]
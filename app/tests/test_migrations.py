@@ -0,0 +1,135 @@
+"""
+기존(baseline) 스키마의 DB를 main.py와 같은 순서(create_all -> run_migrations)로 올리는 테스트
+
+    cd app && python -m pytest tests
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import inspect, text
+
+from database import Base, create_db_engine
+from migrations import MIGRATIONS, create_tables, run_migrations
+from query_plans import check_query_plans
+
+# 첫 커밋의 models.py로 create_all 한 스키마 (마이그레이션 도입 전 운영 DB)
+BASELINE_SCHEMA = """
+CREATE TABLE performances (
+    id INTEGER NOT NULL, mt20id VARCHAR, prfnm VARCHAR, prfpdfrom DATE, prfpdto DATE, fcltynm VARCHAR,
+    poster VARCHAR, genrenm VARCHAR, prfstate VARCHAR, openrun VARCHAR, area VARCHAR, last_updated DATE,
+    PRIMARY KEY (id)
+);
+CREATE INDEX ix_performances_id ON performances (id);
+CREATE UNIQUE INDEX ix_performances_mt20id ON performances (mt20id);
+CREATE TABLE performance_details (
+    id INTEGER NOT NULL, mt20id VARCHAR, prfnm VARCHAR, prfpdfrom DATE, prfpdto DATE, fcltynm VARCHAR,
+    prfcast VARCHAR, prfcrew VARCHAR, prfruntime VARCHAR, prfage VARCHAR, entrpsnm VARCHAR, pcseguidance VARCHAR,
+    poster VARCHAR, sty TEXT, genrenm VARCHAR, prfstate VARCHAR, openrun VARCHAR, styurls TEXT, dtguidance VARCHAR,
+    relates TEXT, last_updated DATE,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_performance_details_mt20id ON performance_details (mt20id);
+CREATE INDEX ix_performance_details_id ON performance_details (id);
+CREATE TABLE performance_facilities (
+    id INTEGER NOT NULL, fcltynm VARCHAR, mt10id VARCHAR, mt13cnt INTEGER, fcltychartr VARCHAR, sidonm VARCHAR,
+    gugunnm VARCHAR, opende VARCHAR, seatscale INTEGER, telno VARCHAR, relateurl VARCHAR, adres VARCHAR,
+    la FLOAT, lo FLOAT,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_performance_facilities_mt10id ON performance_facilities (mt10id);
+CREATE INDEX ix_performance_facilities_id ON performance_facilities (id);
+CREATE TABLE users (id INTEGER NOT NULL, token VARCHAR, PRIMARY KEY (id));
+CREATE UNIQUE INDEX ix_users_token ON users (token);
+CREATE INDEX ix_users_id ON users (id);
+CREATE TABLE upcoming_performances (
+    mt20id VARCHAR NOT NULL, prfnm VARCHAR, prfpdfrom DATE, prfpdto DATE, fcltynm VARCHAR, poster VARCHAR,
+    area VARCHAR, genrenm VARCHAR, openrun VARCHAR, prfstate VARCHAR,
+    PRIMARY KEY (mt20id)
+);
+CREATE INDEX ix_upcoming_performances_prfnm ON upcoming_performances (prfnm);
+CREATE INDEX ix_upcoming_performances_mt20id ON upcoming_performances (mt20id);
+CREATE TABLE user_picks (
+    id INTEGER NOT NULL, token VARCHAR, performance_id VARCHAR,
+    PRIMARY KEY (id),
+    FOREIGN KEY(performance_id) REFERENCES performances (mt20id)
+);
+CREATE INDEX ix_user_picks_token ON user_picks (token);
+CREATE INDEX ix_user_picks_id ON user_picks (id);
+CREATE TABLE user_genres (
+    id INTEGER NOT NULL, user_id INTEGER, genre VARCHAR,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE INDEX ix_user_genres_id ON user_genres (id);
+"""
+
+BASELINE_ROWS = [
+    "INSERT INTO performances (id, mt20id, prfnm, prfpdfrom, prfpdto, genrenm, prfstate, area) "
+    "VALUES (1, 'PF000001', '햄릿', '2026-01-01', '2026-12-31', '연극', '공연중', '서울특별시')",
+    "INSERT INTO performances (id, mt20id, prfnm, prfpdfrom, prfpdto, genrenm, prfstate, area) "
+    "VALUES (2, 'PF000002', '레미제라블', '2026-01-01', '2026-12-31', '뮤지컬', '공연중', '충청북도')",
+    "INSERT INTO performance_facilities (id, fcltynm, mt10id, sidonm, gugunnm, la, lo) "
+    "VALUES (1, '예술의전당', 'FC000001', '서울', '서초구', 37.4786, 127.0118)",
+    "INSERT INTO user_picks (id, token, performance_id) VALUES (1, 'token-a', '뮤지컬')",
+    "INSERT INTO user_picks (id, token, performance_id) VALUES (2, 'token-a', '뮤지컬')",
+]
+
+
+def make_baseline_db(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA.split(";"):
+            if statement.strip():
+                conn.exec_driver_sql(statement)
+        for statement in BASELINE_ROWS:
+            conn.exec_driver_sql(statement)
+    return engine
+
+def upgrade(engine):
+    # main.py와 같은 순서: 없는 테이블만 만든 뒤 마이그레이션 적용
+    create_tables(engine, Base.metadata)
+    return run_migrations(engine)
+
+def test_upgrade_from_baseline_applies_every_migration(tmp_path):
+    engine = make_baseline_db(tmp_path)
+
+    assert upgrade(engine) == [name for name, _ in MIGRATIONS]
+    assert upgrade(engine) == []
+
+def test_concurrent_upgrades_apply_each_migration_once(tmp_path):
+    # 여러 워커가 동시에 시작하는 경우: 워커마다 별도 엔진(연결)으로 같은 파일을 올림
+    make_baseline_db(tmp_path).dispose()
+    engines = [create_db_engine(f"sqlite:///{tmp_path / 'baseline.db'}") for _ in range(4)]
+    with ThreadPoolExecutor(max_workers=len(engines)) as executor:
+        results = list(executor.map(upgrade, engines))
+
+    assert sorted(name for applied in results for name in applied) == sorted(name for name, _ in MIGRATIONS)
+
+def test_upgraded_schema_matches_models(tmp_path):
+    engine = make_baseline_db(tmp_path)
+    upgrade(engine)
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        assert set(table.columns.keys()) <= columns, table.name
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        assert {index.name for index in table.indexes} <= indexes, table.name
+
+def test_upgrade_backfills_existing_rows(tmp_path):
+    engine = make_baseline_db(tmp_path)
+    upgrade(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT mt20id, sido_code FROM performances ORDER BY id")).all() == [
+            ("PF000001", 11), ("PF000002", 43)
+        ]
+        assert conn.execute(text("SELECT sido_code, gugun_code FROM performance_facilities")).one() == (11, 1165)
+        assert conn.execute(text("SELECT count(*) FROM performances_fts WHERE performances_fts MATCH '레미제'")).scalar() == 1
+        assert conn.execute(text("SELECT count(*) FROM performance_facilities_rtree")).scalar() == 1
+
+def test_upgraded_db_uses_expected_indexes(tmp_path):
+    engine = make_baseline_db(tmp_path)
+    upgrade(engine)
+
+    failed = [result for result in check_query_plans(engine) if not result.ok]
+    assert failed == []
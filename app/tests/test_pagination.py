@@ -0,0 +1,54 @@
+"""
+keyset_page의 커서 확인 테스트
+
+    cd app && python -m pytest tests
+"""
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from database import Base
+from models import PerformanceDB, PerformanceFacilityDB
+from pagination import encode_cursor, keyset_page
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pages.db'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(bind=engine) as session:
+        session.add_all(PerformanceFacilityDB(id=id, mt10id=f"FC{id:06d}") for id in range(1, 6))
+        session.add_all(
+            PerformanceDB(id=id, mt20id=f"PF{id:06d}", prfpdfrom=date(2026, 1, id), prfpdto=date(2026, 2, 1))
+            for id in range(1, 6)
+        )
+        session.commit()
+        yield session
+
+def test_cursor_continues_after_last_row(db):
+    facilities, cursor = keyset_page(db.query(PerformanceFacilityDB), [PerformanceFacilityDB.id], 2)
+    assert [facility.id for facility in facilities] == [1, 2]
+
+    facilities, _ = keyset_page(db.query(PerformanceFacilityDB), [PerformanceFacilityDB.id], 2, cursor)
+    assert [facility.id for facility in facilities] == [3, 4]
+
+    columns = [PerformanceDB.prfpdfrom, PerformanceDB.id]
+    performances, _ = keyset_page(db.query(PerformanceDB), columns, 2, encode_cursor([date(2026, 1, 3), 3]))
+    assert [performance.id for performance in performances] == [4, 5]
+
+@pytest.mark.parametrize("columns, values", [
+    ([PerformanceFacilityDB.id], ["x"]),
+    ([PerformanceFacilityDB.id], [True]),
+    ([PerformanceFacilityDB.id], [1.5]),
+    ([PerformanceFacilityDB.id], [None]),
+    ([PerformanceDB.prfpdfrom, PerformanceDB.id], ["2026-13-01", 1]),
+    ([PerformanceDB.prfpdfrom, PerformanceDB.id], [20260101, 1]),
+    ([PerformanceDB.prfpdfrom, PerformanceDB.id], ["2026-01-01", "1"]),
+])
+def test_cursor_values_must_match_column_types(db, columns, values):
+    with pytest.raises(HTTPException) as error:
+        keyset_page(db.query(columns[0].class_), columns, 2, encode_cursor(values))
+    assert error.value.status_code == 400
@@ -0,0 +1,34 @@
+"""
+목록 API 쿼리가 기대한 인덱스를 쓰는지 EXPLAIN QUERY PLAN으로 확인하는 테스트 (query_plans.py와 같은 검사)
+
+    cd app && python -m pytest tests
+"""
+from sqlalchemy import create_engine, text
+
+from database import Base
+from migrations import run_migrations
+from query_plans import check_query_plans
+
+
+def failed_checks(engine):
+    return [(result.name, result.index, result.plan) for result in check_query_plans(engine) if not result.ok]
+
+def test_new_db_uses_expected_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    assert failed_checks(engine) == []
+
+def test_migrations_create_expected_indexes(tmp_path):
+    # 인덱스가 추가되기 전에 만든 DB: 테이블만 있고 조회용 인덱스는 마이그레이션이 만들어야 함
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if not index.unique:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    run_migrations(engine)
+
+    assert failed_checks(engine) == []
@@ -0,0 +1,62 @@
+"""
+benchmarks.fake_kopis 서버를 상대로 동기화를 두 번 실행하는 테스트
+
+    cd app && python -m pytest tests
+"""
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import kopis_cache
+import kopis_client
+import utils
+from benchmarks.fake_kopis import FakeCatalog, FakeKopisServer
+from database import Base
+from kopis_cache import KopisCache
+from models import PerformanceDB, PerformanceDetailDB, PerformanceFacilityDB
+from rate_limit import TokenBucket
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """fake_kopis 서버와 on 모드 캐시. 목록 응답은 바로 만료되어 매번 다시 요청됨"""
+    catalog = FakeCatalog(performances=200, facilities=20)
+    cache = KopisCache(str(tmp_path / "cache.db"), "on")
+    with FakeKopisServer(catalog) as server:
+        monkeypatch.setattr(kopis_client, "KOPIS_API_ROOT", server.api_root)
+        monkeypatch.setattr(kopis_client, "get_cache", lambda: cache)
+        monkeypatch.setattr(kopis_client, "kopis_bucket", TokenBucket(0, 1))
+        monkeypatch.setattr(kopis_cache, "KOPIS_CACHE_TTL_LIST", -1)
+        yield catalog
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sync.db'}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+def sync(db, catalog):
+    start, end = catalog.today - timedelta(days=30), catalog.today + timedelta(days=30)
+    performances = utils.update_database(db, utils.fetch_from_kopis(start, end))
+    facilities = utils.update_facilities_database(db, utils.fetch_facilities_from_kopis())
+    return performances, facilities
+
+def test_changed_records_refetch_details(catalog, db):
+    sync(db, catalog)
+
+    # 공연 상태는 날짜에 따라 바뀌고, 시설은 목록과 상세정보를 함께 바꿈
+    catalog.today += timedelta(days=10)
+    list_fields, detail_fields = catalog.facility_list_fields, catalog.facility_detail_fields
+    catalog.facility_list_fields = lambda index: {**list_fields(index), "fcltynm": f"새 공연장 {index}"}
+    catalog.facility_detail_fields = lambda index: {**detail_fields(index), "adres": f"새 주소 {index}"}
+
+    performances, facilities = sync(db, catalog)
+    assert performances.written > 0 and facilities.written == catalog.facility_count
+
+    listed = dict(db.query(PerformanceDB.mt20id, PerformanceDB.prfstate))
+    details = dict(db.query(PerformanceDetailDB.mt20id, PerformanceDetailDB.prfstate))
+    assert details == listed
+    assert {adres for (adres,) in db.query(PerformanceFacilityDB.adres)} == {f"새 주소 {index}" for index in range(catalog.facility_count)}
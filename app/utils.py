@@ -1,82 +1,113 @@
+import hashlib
 import json
 import os
 import re
-from typing import List, Optional
-import requests
-import xmltodict
-from datetime import datetime
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from datetime import datetime, timedelta
 from schemas import Performance
-from models import PerformanceDB, PerformanceDetailDB, PerformanceFacilityDB, UpcomingPerformanceDB
-from config import KOPIS_API_KEY, KOPIS_BASE_URL
+from kopis_xml import iter_kopis_records, parse_kopis_record
+from kopis_client import kopis_get
+from bulk import bulk_upsert, existing_keys, stored_values
+from models import PerformanceDB, PerformanceDetailDB, PerformanceFacilityDB, SyncState, UpcomingPerformanceDB, UPCOMING_PERFORMANCE_SLOTS
+from config import KOPIS_MAX_WORKERS, KOPIS_SHARD_DAYS, SYNC_CHUNK_SIZE
+from region_codes import gugun_code_of, sido_code_of
+from genre_codes import genre_code_of
+from sqlalchemy import Integer, String, cast
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, Session
 import jwt
 from datetime import datetime, timedelta
 from fastapi import HTTPException
 
 
-def fetch_from_kopis(start_date, end_date):
+def iter_kopis_pages(endpoint: str, params: dict, rows: int) -> Iterator[dict]:
+    """
+    cpage를 1부터 증가시키며 목록이 끝날 때까지 요청하고, 레코드를 하나씩 반환합니다.
+    """
+    cpage = 1
+    while True:
+        content = kopis_get(endpoint, {**params, "cpage": cpage, "rows": rows})
+
+        count = 0
+        for record in iter_kopis_records(content):
+            count += 1
+            yield record
+
+        if count < rows:
+            return
+        cpage += 1
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def fetch_from_kopis(start_date, end_date, rows: int = 1000) -> Iterator[dict]:
     params = {
-        "service": KOPIS_API_KEY,
         "stdate": start_date.strftime("%Y%m%d"),
         "eddate": end_date.strftime("%Y%m%d"),
-        "cpage": 1,
-        "rows": 1000,
     }
-    
-    response = requests.get(KOPIS_BASE_URL, params=params)
-    response.raise_for_status()
-    
-    data = xmltodict.parse(response.content, encoding='utf-8')
-    performances = data['dbs']['db']
-    
-    if not isinstance(performances, list):
-        performances = [performances]
-    
-    return performances
+    return iter_kopis_pages("pblprfr", params, rows)
 
-def fetch_facilities_from_kopis(signgucode: Optional[str] = None):
-    params = {
-        "service": KOPIS_API_KEY,
-        "cpage": 1,
-        "rows": 1500,
-    }
+def date_shards(start_date, end_date, shard_days: int = KOPIS_SHARD_DAYS) -> List[Tuple]:
+    shards = []
+    shard_start = start_date
+    while shard_start <= end_date:
+        shard_end = min(end_date, shard_start + timedelta(days=max(1, shard_days) - 1))
+        shards.append((shard_start, shard_end))
+        shard_start = shard_end + timedelta(days=1)
+    return shards
+
+def fetch_from_kopis_sharded(start_date, end_date, shard_days: int = KOPIS_SHARD_DAYS, max_workers: int = KOPIS_MAX_WORKERS, rows: int = 1000) -> Iterator[dict]:
+    """
+    기간을 shard_days 단위로 나눠 동시에 조회하고, 기간 순서대로 하나의 스트림으로 합쳐 반환합니다.
+    여러 구간에 걸친 공연은 mt20id 기준으로 처음 한 번만 반환합니다.
+    동시에 진행하는 구간은 max_workers개로 제한되므로 메모리는 구간 크기에 비례합니다.
+    """
+    def fetch_shard(shard) -> List[dict]:
+        return list(fetch_from_kopis(shard[0], shard[1], rows=rows))
+
+    shards = iter(date_shards(start_date, end_date, shard_days))
+    seen = set()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        pending = deque(executor.submit(fetch_shard, shard) for shard in islice(shards, max(1, max_workers)))
+        try:
+            while pending:
+                records = pending.popleft().result()
+                for shard in islice(shards, 1):
+                    pending.append(executor.submit(fetch_shard, shard))
+
+                for record in records:
+                    if record['mt20id'] not in seen:
+                        seen.add(record['mt20id'])
+                        yield record
+        finally:
+            # 소비가 중간에 끝나면 아직 시작하지 않은 구간은 취소
+            for future in pending:
+                future.cancel()
+
+def fetch_facilities_from_kopis(signgucode: Optional[str] = None, rows: int = 1500) -> Iterator[dict]:
+    params = {}
     if signgucode:
         params["signgucode"] = signgucode
     
-    response = requests.get("http://kopis.or.kr/openApi/restful/prfplc", params=params)
-    response.raise_for_status()
-    
-    data = xmltodict.parse(response.content, encoding='utf-8')
-    facilities = data['dbs']['db']
-    
-    if not isinstance(facilities, list):
-        facilities = [facilities]
-    
-    return facilities
+    return iter_kopis_pages("prfplc", params, rows)
 
-def fetch_performance_detail(mt20id):
-    params = {
-        "service": KOPIS_API_KEY,
-        "mt20id": mt20id
-    }
-    
-    response = requests.get(f"{KOPIS_BASE_URL}/{mt20id}", params=params)
-    response.raise_for_status()
-    
-    data = xmltodict.parse(response.content, encoding='utf-8')
-    return data['dbs']['db']
+def fetch_performance_detail(mt20id, refresh: bool = False):
+    return parse_kopis_record(kopis_get(f"pblprfr/{mt20id}", {"mt20id": mt20id}, refresh=refresh))
 
-def fetch_facility_detail_from_kopis(mt10id: str):
-    params = {
-        "service": KOPIS_API_KEY,
-        "mt10id": mt10id
-    }
-    
-    response = requests.get(f"http://kopis.or.kr/openApi/restful/prfplc/{mt10id}", params=params)
-    response.raise_for_status()
-    
-    data = xmltodict.parse(response.content, encoding='utf-8')
-    return data['dbs']['db']
+def fetch_facility_detail_from_kopis(mt10id: str, refresh: bool = False):
+    return parse_kopis_record(kopis_get(f"prfplc/{mt10id}", {"mt10id": mt10id}, refresh=refresh))
 
 def decode_unicode_escape(s):
     return re.sub(r'\\u([0-9a-fA-F]{4})', lambda m: chr(int(m.group(1), 16)), s)
@@ -94,108 +125,236 @@ def process_relates(relates):
         }
     return relates
 
-def update_database(db: Session, performances):
+class FetchResult(NamedTuple):
+    key: str
+    value: Optional[dict]
+    error: Optional[Exception]
+
+class SyncResult(NamedTuple):
+    processed: int
+    failed: List[FetchResult]
+    written: int = 0
+
+def fetch_many(keys: List[str], fetch: Callable[[str], dict], max_workers: int = KOPIS_MAX_WORKERS) -> List[FetchResult]:
+    """
+    keys 각각에 대해 fetch를 최대 max_workers개까지 동시에 실행합니다.
+    결과는 입력 순서대로 반환되며, 실패한 항목은 error에 예외를 담고 나머지 배치는 계속 진행합니다.
+    """
+    results: List[Optional[FetchResult]] = [None] * len(keys)
+    if not keys:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys)))) as executor:
+        futures = {executor.submit(fetch, key): index for index, key in enumerate(keys)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = FetchResult(keys[index], future.result(), None)
+            except Exception as e:
+                results[index] = FetchResult(keys[index], None, e)
+
+    return results
+
+def parse_kopis_date(value: str):
+    return datetime.strptime(value, "%Y.%m.%d").date()
+
+def performance_row(perf) -> dict:
+    return dict(
+        mt20id=perf['mt20id'],
+        prfnm=perf['prfnm'],
+        prfpdfrom=parse_kopis_date(perf['prfpdfrom']),
+        prfpdto=parse_kopis_date(perf['prfpdto']),
+        fcltynm=perf['fcltynm'],
+        poster=perf['poster'],
+        genrenm=perf['genrenm'],
+        genre_code=genre_code_of(perf['genrenm']),
+        prfstate=perf['prfstate'],
+        openrun=perf.get('openrun'),
+        area=perf.get('area'),
+        sido_code=sido_code_of(perf.get('area')),
+        last_updated=datetime.now().date()
+    )
+
+def performance_detail_row(detail) -> dict:
+    styurls = ','.join(url for url in detail.get('styurls') or [] if url)
+
+    relates = [relate for relate in detail.get('relates') or [] if relate]
+    if relates:
+        # 관련 링크가 하나뿐이면 기존과 같이 리스트가 아닌 객체로 저장
+        relates_str = json.dumps(process_relates(relates[0] if len(relates) == 1 else relates), ensure_ascii=False)
+    else:
+        relates_str = ''
+
+    return dict(
+        mt20id=detail['mt20id'],
+        prfnm=detail['prfnm'],
+        prfpdfrom=parse_kopis_date(detail['prfpdfrom']),
+        prfpdto=parse_kopis_date(detail['prfpdto']),
+        fcltynm=detail['fcltynm'],
+        prfcast=detail['prfcast'],
+        prfcrew=detail['prfcrew'],
+        prfruntime=detail['prfruntime'],
+        prfage=detail['prfage'],
+        entrpsnm=detail['entrpsnm'],
+        pcseguidance=detail['pcseguidance'],
+        poster=detail['poster'],
+        sty=detail['sty'],
+        genrenm=detail['genrenm'],
+        prfstate=detail['prfstate'],
+        openrun=detail.get('openrun'),
+        styurls=styurls,
+        dtguidance=detail['dtguidance'],
+        relates=relates_str,
+        last_updated=datetime.now().date()
+    )
+
+def facility_row(facility, detail) -> dict:
+    sido_code = sido_code_of(facility['sidonm'])
+    return dict(
+        fcltynm=facility['fcltynm'],
+        mt10id=facility['mt10id'],
+        mt13cnt=int(facility['mt13cnt']),
+        fcltychartr=facility['fcltychartr'],
+        sidonm=facility['sidonm'],
+        gugunnm=facility['gugunnm'],
+        sido_code=sido_code,
+        gugun_code=gugun_code_of(sido_code, facility['gugunnm']),
+        opende=facility['opende'],
+        seatscale=int(detail['seatscale']),
+        telno=detail['telno'],
+        relateurl=detail['relateurl'],
+        adres=detail['adres'],
+        la=float(detail['la']),
+        lo=float(detail['lo'])
+    )
+
+def upcoming_performance_row(perf) -> dict:
+    return dict(
+        mt20id=perf.get('mt20id'),
+        prfnm=perf.get('prfnm'),
+        prfpdfrom=parse_kopis_date(perf.get('prfpdfrom')),
+        prfpdto=parse_kopis_date(perf.get('prfpdto')),
+        fcltynm=perf.get('fcltynm'),
+        poster=perf.get('poster'),
+        genrenm=perf.get('genrenm'),
+        prfstate=perf.get('prfstate'),
+        openrun=perf.get('openrun'),
+    )
+
+def content_hash(record: dict) -> str:
+    """목록 API 레코드의 해시. 값이 같으면 다시 쓰거나 상세정보를 다시 가져오지 않습니다."""
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def dedupe(records: List[dict], key: str) -> List[dict]:
+    # 같은 청크에 같은 키가 두 번 나오면 ON CONFLICT가 한 문장 안에서 충돌하므로 마지막 값만 남김
+    return list({record[key]: record for record in records}.values())
+
+def update_database(db: Session, performances: Iterable[dict], max_workers: int = KOPIS_MAX_WORKERS, chunk_size: int = SYNC_CHUNK_SIZE) -> SyncResult:
+    processed = 0
+    written = 0
+    failed = []
+    for chunk in chunked(performances, chunk_size):
+        chunk_written, chunk_failed = _update_performance_chunk(db, dedupe(chunk, 'mt20id'), max_workers)
+        db.commit()
+        processed += len(chunk)
+        written += chunk_written
+        failed.extend(chunk_failed)
+
+    if written:
+        bump_sync_generation(db)
+
+    for result in failed:
+        print(f"Failed to fetch performance detail {result.key}: {result.error}")
+
+    return SyncResult(processed, failed, written)
+
+def _update_performance_chunk(db: Session, performances: List[dict], max_workers: int) -> Tuple[int, List[FetchResult]]:
+    mt20ids = [perf['mt20id'] for perf in performances]
+    stored_hashes = stored_values(db, PerformanceDB.mt20id, PerformanceDB.content_hash, mt20ids)
+    stored_details = existing_keys(db, PerformanceDetailDB.mt20id, mt20ids)
+
+    # 새로 생겼거나 목록 응답이 바뀐 공연만 기록
+    rows = {}
     for perf in performances:
-        db_perf = db.query(PerformanceDB).filter(PerformanceDB.mt20id == perf['mt20id']).first()
-        if not db_perf:
-            new_perf = PerformanceDB(
-                mt20id=perf['mt20id'],
-                prfnm=perf['prfnm'],
-                prfpdfrom=datetime.strptime(perf['prfpdfrom'], "%Y.%m.%d").date(),
-                prfpdto=datetime.strptime(perf['prfpdto'], "%Y.%m.%d").date(),
-                fcltynm=perf['fcltynm'],
-                poster=perf['poster'],
-                genrenm=perf['genrenm'],
-                prfstate=perf['prfstate'],
-                openrun=perf.get('openrun'),
-                area=perf.get('area'),
-                last_updated=datetime.now().date()
-            )
-            db.add(new_perf)
-
-        db_detail = db.query(PerformanceDetailDB).filter(PerformanceDetailDB.mt20id == perf['mt20id']).first()
-        if not db_detail:
-            detail = fetch_performance_detail(perf['mt20id'])
-            
-            if isinstance(detail['styurls']['styurl'], list):
-                styurls = ','.join(detail['styurls']['styurl'])
-            elif isinstance(detail['styurls']['styurl'], str):
-                styurls = detail['styurls']['styurl']
-            else:
-                styurls = ''
-
-            if 'relates' in detail and 'relate' in detail['relates']:
-                relates = process_relates(detail['relates']['relate'])
-                relates_str = json.dumps(relates, ensure_ascii=False)
-            else:
-                relates_str = ''
-
-            new_detail = PerformanceDetailDB(
-                mt20id=detail['mt20id'],
-                prfnm=detail['prfnm'],
-                prfpdfrom=datetime.strptime(detail['prfpdfrom'], "%Y.%m.%d").date(),
-                prfpdto=datetime.strptime(detail['prfpdto'], "%Y.%m.%d").date(),
-                fcltynm=detail['fcltynm'],
-                prfcast=detail['prfcast'],
-                prfcrew=detail['prfcrew'],
-                prfruntime=detail['prfruntime'],
-                prfage=detail['prfage'],
-                entrpsnm=detail['entrpsnm'],
-                pcseguidance=detail['pcseguidance'],
-                poster=detail['poster'],
-                sty=detail['sty'],
-                genrenm=detail['genrenm'],
-                prfstate=detail['prfstate'],
-                openrun=detail.get('openrun'),
-                styurls=styurls,
-                dtguidance=detail['dtguidance'],
-                relates=relates_str,
-                last_updated=datetime.now().date()
-            )
-            db.add(new_detail)
-    
+        digest = content_hash(perf)
+        if stored_hashes.get(perf['mt20id']) != digest:
+            rows[perf['mt20id']] = {**performance_row(perf), 'content_hash': digest}
+
+    # 바뀐 공연과 상세정보가 없는 공연만 동시에 가져오고, 실패한 항목은 건너뜀
+    missing_details = [mt20id for mt20id in mt20ids if mt20id in rows or mt20id not in stored_details]
+
+    # 읽기 트랜잭션을 끝내 KOPIS 요청 동안 쓰기 연결을 다른 작업이 쓸 수 있도록 함
     db.commit()
+    failed = []
+    detail_rows = []
+    # 목록이 바뀐 공연은 캐시에 남은 이전 상세정보 대신 새로 받아옴
+    fetch = lambda mt20id: fetch_performance_detail(mt20id, refresh=mt20id in rows)
+    for result in fetch_many(missing_details, fetch, max_workers):
+        try:
+            if result.error is not None:
+                raise result.error
+            detail_rows.append(performance_detail_row(result.value))
+        except Exception as e:
+            failed.append(result._replace(error=e))
+            # 해시를 비워 두어 다음 동기화에서 상세정보를 다시 시도하도록 함
+            if result.key in rows:
+                rows[result.key]['content_hash'] = None
 
-def update_facilities_database(db: Session, facilities):
+    bulk_upsert(db, PerformanceDB, list(rows.values()), 'mt20id')
+    bulk_upsert(db, PerformanceDetailDB, dedupe(detail_rows, 'mt20id'), 'mt20id')
+    return len(rows), failed
+
+def update_facilities_database(db: Session, facilities: Iterable[dict], max_workers: int = KOPIS_MAX_WORKERS, chunk_size: int = SYNC_CHUNK_SIZE) -> SyncResult:
+    processed = 0
+    written = 0
+    failed = []
+    for chunk in chunked(facilities, chunk_size):
+        chunk_written, chunk_failed = _update_facility_chunk(db, dedupe(chunk, 'mt10id'), max_workers)
+        db.commit()
+        processed += len(chunk)
+        written += chunk_written
+        failed.extend(chunk_failed)
+
+    if written:
+        bump_sync_generation(db)
+
+    for result in failed:
+        print(f"Failed to fetch facility detail {result.key}: {result.error}")
+
+    return SyncResult(processed, failed, written)
+
+def _update_facility_chunk(db: Session, facilities: List[dict], max_workers: int) -> Tuple[int, List[FetchResult]]:
+    stored_hashes = stored_values(
+        db, PerformanceFacilityDB.mt10id, PerformanceFacilityDB.content_hash,
+        [facility['mt10id'] for facility in facilities]
+    )
+
+    # 새로 생겼거나 목록 응답이 바뀐 시설만 상세 정보 가져오기
+    changed = []
     for facility in facilities:
-        db_facility = db.query(PerformanceFacilityDB).filter(PerformanceFacilityDB.mt10id == facility['mt10id']).first()
-        
-        # 상세 정보 가져오기
-        detail = fetch_facility_detail_from_kopis(facility['mt10id'])
-        
-        if not db_facility:
-            new_facility = PerformanceFacilityDB(
-                fcltynm=facility['fcltynm'],
-                mt10id=facility['mt10id'],
-                mt13cnt=int(facility['mt13cnt']),
-                fcltychartr=facility['fcltychartr'],
-                sidonm=facility['sidonm'],
-                gugunnm=facility['gugunnm'],
-                opende=facility['opende'],
-                seatscale=int(detail['seatscale']),
-                telno=detail['telno'],
-                relateurl=detail['relateurl'],
-                adres=detail['adres'],
-                la=float(detail['la']),
-                lo=float(detail['lo'])
-            )
-            db.add(new_facility)
-        else:
-            # 기존 데이터 업데이트
-            db_facility.fcltynm = facility['fcltynm']
-            db_facility.mt13cnt = int(facility['mt13cnt'])
-            db_facility.fcltychartr = facility['fcltychartr']
-            db_facility.sidonm = facility['sidonm']
-            db_facility.gugunnm = facility['gugunnm']
-            db_facility.opende = facility['opende']
-            db_facility.seatscale = int(detail['seatscale'])
-            db_facility.telno = detail['telno']
-            db_facility.relateurl = detail['relateurl']
-            db_facility.adres = detail['adres']
-            db_facility.la = float(detail['la'])
-            db_facility.lo = float(detail['lo'])
-    
+        digest = content_hash(facility)
+        if stored_hashes.get(facility['mt10id']) != digest:
+            changed.append((facility, digest))
+
+    # 읽기 트랜잭션을 끝내 KOPIS 요청 동안 쓰기 연결을 다른 작업이 쓸 수 있도록 함
     db.commit()
+    # 캐시에 남은 이전 상세정보 대신 새로 받아옴
+    fetch = lambda mt10id: fetch_facility_detail_from_kopis(mt10id, refresh=True)
+    details = fetch_many([facility['mt10id'] for facility, _ in changed], fetch, max_workers)
+
+    failed = []
+    rows = []
+    for (facility, digest), result in zip(changed, details):
+        try:
+            if result.error is not None:
+                raise result.error
+            rows.append({**facility_row(facility, result.value), 'content_hash': digest})
+        except Exception as e:
+            failed.append(result._replace(error=e))
+
+    bulk_upsert(db, PerformanceFacilityDB, rows, 'mt10id')
+    return len(rows), failed
 
 def get_example_value(schema):
     if 'example' in schema:
@@ -240,7 +399,8 @@ ALGORITHM = "HS256"
 
 def create_token():
     payload = {
-        "exp": datetime.utcnow() + timedelta(days=30)  # 토큰 유효기간 30일
+        "exp": datetime.utcnow() + timedelta(days=30),  # 토큰 유효기간 30일
+        "jti": secrets.token_hex(8)  # 같은 시각에 발급한 토큰도 서로 달라 user_key가 겹치지 않도록
     }
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
@@ -252,24 +412,94 @@ def verify_token(token: str):
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
-    
-def update_upcoming_performances(db: Session, performances: List[dict]):
-    db.query(UpcomingPerformanceDB).delete()  # 기존 데이터를 삭제하고 새로 입력
 
-    for perf in performances:
-        # 사전 데이터를 DB 모델로 변환
-        new_perf = UpcomingPerformanceDB(
-            mt20id=perf.get('mt20id'),
-            prfnm=perf.get('prfnm'),
-            prfpdfrom=datetime.strptime(perf.get('prfpdfrom'), "%Y.%m.%d").date(),
-            prfpdto=datetime.strptime(perf.get('prfpdto'), "%Y.%m.%d").date(),
-            fcltynm=perf.get('fcltynm'),
-            poster=perf.get('poster'),
-            genrenm=perf.get('genrenm'),
-            prfstate=perf.get('prfstate'),
-            openrun=perf.get('openrun'),
-        )
-        db.add(new_perf)
+def user_key_of(token: str) -> int:
+    """토큰 대신 사용자 Pick의 키로 쓰는 값 (토큰 SHA-256의 앞 8바이트, SQLite INTEGER 범위)"""
+    return int.from_bytes(hashlib.sha256(token.encode()).digest()[:8], "big", signed=True)
     
+SYNC_GENERATION_KEY = 'sync_generation'
+
+def get_sync_state(db: Session, key: str, default: Optional[str] = None) -> Optional[str]:
+    state = db.get(SyncState, key)
+    return state.value if state is not None else default
+
+def set_sync_state(db: Session, key: str, value: str):
+    bulk_upsert(db, SyncState, [{'key': key, 'value': value}], 'key')
+
+def get_sync_generation(db: Session) -> str:
+    """동기화로 데이터가 바뀔 때마다 증가하는 값. 메모리 인덱스/캐시가 갱신 여부를 판단할 때 사용합니다."""
+    return get_sync_state(db, SYNC_GENERATION_KEY, '0')
+
+class GenerationWatcher:
+    """
+    메모리 캐시/인덱스가 동기화 세대를 확인하는 주기를 관리합니다.
+    check_interval초에 한 번만 DB를 조회하고, 마지막으로 반영한 세대와 다를 때만 새 세대를 알려줍니다.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self.generation: Optional[str] = None  # 마지막으로 반영한 세대
+        self.checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _due(self) -> bool:
+        return self.checked_at is None or time.monotonic() - self.checked_at >= self.check_interval
+
+    def poll(self, db: Session) -> Optional[str]:
+        """확인할 때가 되었고 세대가 바뀌었으면 새 세대를, 아니면 None을 반환합니다. (동시에 호출해도 한 번만 조회)"""
+        if not self._due():
+            return None
+        with self._lock:
+            if not self._due():
+                return None
+            generation = get_sync_generation(db)
+            self.checked_at = time.monotonic()
+        return generation if generation != self.generation else None
+
+    def mark(self, generation: Optional[str]):
+        """generation까지 반영했음을 기록합니다."""
+        self.generation = generation
+        self.checked_at = time.monotonic()
+
+    def reset(self):
+        # 다음 poll에서 바로 다시 확인
+        self.generation = None
+        self.checked_at = None
+
+def bump_sync_generation(db: Session):
+    # 다른 프로세스의 갱신과 겹쳐도 값이 줄지 않도록 DB에서 직접 증가
+    db.execute(
+        sqlite_insert(SyncState)
+        .values(key=SYNC_GENERATION_KEY, value='1')
+        .on_conflict_do_update(index_elements=['key'], set_={'value': cast(cast(SyncState.value, Integer) + 1, String)})
+    )
+    db.commit()
+
+def get_live_upcoming_model(db: Session):
+    """현재 조회용으로 사용 중인 공연 예정 테이블의 모델"""
+    table = get_sync_state(db, 'upcoming_performances_table', UpcomingPerformanceDB.__tablename__)
+    return UPCOMING_PERFORMANCE_SLOTS.get(table, UpcomingPerformanceDB)
+
+def update_upcoming_performances(db: Session, performances: Iterable[dict], chunk_size: int = SYNC_CHUNK_SIZE) -> int:
+    # 조회에 쓰이지 않는 쪽 테이블을 비우고 새로 채움 (청크마다 커밋해도 조회에는 영향 없음)
+    live = get_live_upcoming_model(db)
+    staging = next(model for model in UPCOMING_PERFORMANCE_SLOTS.values() if model is not live)
+    db.query(staging).delete()
+    db.commit()
+
+    processed = 0
+    for chunk in chunked(performances, chunk_size):
+        rows = [upcoming_performance_row(perf) for perf in chunk]
+        bulk_upsert(db, staging, dedupe(rows, 'mt20id'), 'mt20id')
+        db.commit()
+        processed += len(chunk)
+
+    # 다 채운 뒤 포인터만 바꿔서 한 번에 교체
+    set_sync_state(db, 'upcoming_performances_table', staging.__tablename__)
     db.commit()
+    bump_sync_generation(db)
+    return processed
 
+def clear_upcoming_performances(db: Session) -> int:
+    """빈 테이블로 교체하여 공연 예정 목록을 비웁니다."""
+    return update_upcoming_performances(db, [])